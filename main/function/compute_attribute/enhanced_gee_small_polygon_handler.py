@@ -24,13 +24,58 @@ Date: 2025
 
 import ee
 import json
+import logging
 import numpy as np
 import math
+import statistics
 from datetime import datetime, timedelta
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
 from typing import Dict, List, Tuple, Optional, Union
-from google.oauth2 import service_account
-import os
-from dotenv import load_dotenv
+import threading
+
+from gee_solar_data import initialize_earth_engine
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+EARTH_RADIUS_M = 6378137.0  # WGS84 equatorial radius, as used by Earth Engine
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True, fastmath=True)
+    def _spherical_polygon_area_m2(coords):
+        """Spherical polygon area of an (N, 2) lon/lat ring; the closing edge is implied"""
+        n = coords.shape[0]
+        deg = math.pi / 180.0
+        excess = 0.0
+        for i in range(n):
+            j = i + 1 if i + 1 < n else 0
+            excess += ((coords[j, 0] - coords[i, 0]) * deg
+                       * (2.0 + math.sin(coords[i, 1] * deg) + math.sin(coords[j, 1] * deg)))
+        return abs(excess) * EARTH_RADIUS_M * EARTH_RADIUS_M / 2.0
+
+
+def spherical_polygon_area(polygon_coords: List[Tuple[float, float]]) -> float:
+    """Area in m² of a (lon, lat) polygon on a sphere, well within 0.01% of GEE for rooftops"""
+    coords = np.asarray(polygon_coords, dtype=np.float64)[:, :2]
+    if len(coords) < 3:
+        return 0.0
+    if NUMBA_AVAILABLE:
+        # Scalar loop beats numpy's temporaries for the handful of vertices in a rooftop
+        return float(_spherical_polygon_area_m2(np.ascontiguousarray(coords)))
+    if not np.array_equal(coords[0], coords[-1]):
+        coords = np.vstack([coords, coords[:1]])
+    
+    lon = np.radians(coords[:, 0])
+    sin_lat = np.sin(np.radians(coords[:, 1]))
+    excess = np.sum((lon[1:] - lon[:-1]) * (2 + sin_lat[:-1] + sin_lat[1:]))
+    return float(abs(excess) * EARTH_RADIUS_M ** 2 / 2)
+
 
 class EnhancedGEESmallPolygonHandler:
     """
@@ -38,51 +83,69 @@ class EnhancedGEESmallPolygonHandler:
     Implements multiple strategies to avoid null values while maintaining scientific validity
     """
     
+    # Method cascade for each preferred method; unknown names use the adaptive_buffering order
+    _FALLBACK_ORDERS = {
+        'adaptive_buffering': ('adaptive_buffering', 'multi_scale', 'interpolation', 'nearest_neighbor'),
+        'multi_scale':        ('multi_scale', 'adaptive_buffering', 'interpolation', 'nearest_neighbor'),
+        'interpolation':      ('interpolation', 'adaptive_buffering', 'multi_scale', 'nearest_neighbor'),
+        'nearest_neighbor':   ('nearest_neighbor', 'adaptive_buffering', 'multi_scale', 'interpolation'),
+    }
+    
     def __init__(self):
         """Initialize the enhanced handler"""
         self.authenticate_gee()
         self.initialize_datasets()
         
+        # Reducers are built once and reused so every request serializes identical sub-graphs
+        self._r_mean = ee.Reducer.mean()
+        self._r_median = ee.Reducer.median()
+        self._r_mode = ee.Reducer.mode()
+        self._r_first = ee.Reducer.first()
+        self._r_combined = (self._r_mean
+                            .combine(self._r_median, sharedInputs=True)
+                            .combine(self._r_mode, sharedInputs=True))
+        
         # ERA5 Land characteristics
         self.era5_native_resolution = 11132  # meters (~9-11 km)
         self.era5_pixel_size_degrees = 0.1   # degrees (approximately)
+        self.era5_pixel_area_m2 = self.era5_native_resolution ** 2
         
         # Quality thresholds
         self.min_polygon_area_m2 = 100       # Minimum meaningful polygon area
         self.max_buffer_distance_m = 15000   # Maximum buffer distance (1.5 ERA5 pixels)
         
+        # Retrieval methods by name; each takes (geometry, polygon_area_m2, mean_img)
+        self._method_dispatch = {
+            'adaptive_buffering': self._do_adaptive,
+            'multi_scale': lambda geometry, area, mean_img: self.method_2_multi_scale_sampling(geometry, mean_img),
+            'interpolation': lambda geometry, area, mean_img: self.method_3_spatial_interpolation(geometry, mean_img),
+            'nearest_neighbor': lambda geometry, area, mean_img: self.method_4_nearest_neighbor_sampling(geometry, mean_img),
+        }
+        
+        # Same methods as (server-side expression, finisher) pairs for batched evaluation
+        self._method_plans = {
+            'adaptive_buffering': self._adaptive_plan,
+            'multi_scale': lambda geometry, area, mean_img: self._multi_scale_plan(geometry, mean_img),
+            'interpolation': lambda geometry, area, mean_img: self._interpolation_plan(geometry, mean_img),
+            'nearest_neighbor': lambda geometry, area, mean_img: self._nearest_neighbor_plan(geometry, mean_img),
+        }
+        
+        # (coords, start, end, method) -> Future of (result, method_info); the fallback
+        # cascades of concurrent compare_methods runs share each method's GEE work
+        self._method_cache: OrderedDict = OrderedDict()
+        self._method_cache_lock = threading.Lock()
+        self._method_cache_size = 64
+        
     def authenticate_gee(self):
         """Authenticate with Google Earth Engine using service account"""
         try:
-            # Load environment variables
-            load_dotenv()
-            
-            # Build service account info from environment variables
-            service_account_info = {
-                "type": os.getenv("GOOGLE_TYPE"),
-                "project_id": os.getenv("GOOGLE_PROJECT_ID"),
-                "private_key_id": os.getenv("GOOGLE_PRIVATE_KEY_ID"),
-                "private_key": os.getenv("GOOGLE_PRIVATE_KEY").replace('\\n', '\n'),
-                "client_email": os.getenv("GOOGLE_CLIENT_EMAIL"),
-                "client_id": os.getenv("GOOGLE_CLIENT_ID"),
-                "auth_uri": os.getenv("GOOGLE_AUTH_URI"),
-                "token_uri": os.getenv("GOOGLE_TOKEN_URI"),
-                "auth_provider_x509_cert_url": os.getenv("GOOGLE_AUTH_PROVIDER_CERT_URL"),
-                "client_x509_cert_url": os.getenv("GOOGLE_CLIENT_CERT_URL"),
-            }
-            
-            # Create credentials
-            credentials = service_account.Credentials.from_service_account_info(
-                service_account_info,
-                scopes=["https://www.googleapis.com/auth/earthengine"]
-            )
-            
-            # Initialize Earth Engine
-            ee.Initialize(credentials)
-            print("✅ Enhanced GEE Handler: Authentication successful!")
+            # The ee session is process-wide and shared with GEESolarDataRetriever,
+            # so both initialize it once against the same (high-volume) endpoint
+            initialize_earth_engine()
+            logger.info("✅ Enhanced GEE Handler: Authentication successful!")
             
         except Exception as e:
-            print(f"❌ GEE Authentication failed: {str(e)}")
+            logger.error("❌ GEE Authentication failed: %s", e)
             raise
     
     def initialize_datasets(self):
@@ -94,10 +157,10 @@ class EnhancedGEESmallPolygonHandler:
             # ERA5 hourly for higher temporal resolution (if needed)
             self.era5_hourly = ee.ImageCollection("ECMWF/ERA5_LAND/HOURLY")
             
-            print("✅ Enhanced GEE Handler: Datasets initialized!")
+            logger.info("✅ Enhanced GEE Handler: Datasets initialized!")
             
         except Exception as e:
-            print(f"❌ Dataset initialization failed: {str(e)}")
+            logger.error("❌ Dataset initialization failed: %s", e)
             raise
     
     def create_polygon_geometry(self, polygon_coords: List[Tuple[float, float]]) -> ee.Geometry:
@@ -106,16 +169,23 @@ class EnhancedGEESmallPolygonHandler:
             raise ValueError("Polygon must have at least 3 coordinates")
         
         # Convert to GEE format: [[lon, lat], [lon, lat], ...]
-        gee_coords = [[coord[0], coord[1]] for coord in polygon_coords]
+        coords = np.asarray(polygon_coords, dtype=np.float64)[:, :2]
         
         # Close the polygon if not already closed
-        if gee_coords[0] != gee_coords[-1]:
-            gee_coords.append(gee_coords[0])
+        if not np.array_equal(coords[0], coords[-1]):
+            coords = np.vstack([coords, coords[:1]])
         
-        return ee.Geometry.Polygon([gee_coords])
+        return ee.Geometry.Polygon([coords.tolist()])
     
-    def calculate_polygon_area(self, geometry: ee.Geometry) -> float:
-        """Calculate polygon area in square meters"""
+    def calculate_polygon_area(self, geometry: Union[ee.Geometry, List[Tuple[float, float]]]) -> float:
+        """
+        Calculate polygon area in square meters
+        
+        Plain (lon, lat) coordinates are measured locally with the spherical polygon
+        area formula; only derived ee.Geometry objects (e.g. buffers) need a GEE call.
+        """
+        if not isinstance(geometry, ee.Geometry):
+            return spherical_polygon_area(geometry)
         try:
             area_info = geometry.area(maxError=1).getInfo()
             return area_info
@@ -131,8 +201,7 @@ class EnhancedGEESmallPolygonHandler:
         - Buffer distance should be proportional to the mismatch in scale
         - Limit buffer to maintain spatial representativeness
         """
-        # ERA5 pixel area (approximately)
-        era5_pixel_area_m2 = self.era5_native_resolution ** 2
+        era5_pixel_area_m2 = self.era5_pixel_area_m2
         
         if polygon_area_m2 >= era5_pixel_area_m2 * 0.25:
             # Polygon is reasonably sized relative to ERA5 pixel
@@ -166,7 +235,8 @@ class EnhancedGEESmallPolygonHandler:
                 'method': 'adaptive_buffering',
                 'buffer_distance_m': buffer_distance,
                 'original_area_m2': polygon_area_m2,
-                'buffered_area_m2': self.calculate_polygon_area(buffered_geometry),
+                # Informational only: circle-equivalent estimate instead of another getInfo()
+                'buffered_area_m2': math.pi * (math.sqrt(polygon_area_m2 / math.pi) + buffer_distance) ** 2,
                 'scientific_validity': 'High',
                 'rationale': 'Expands ROI to ensure ERA5 pixel intersection while maintaining spatial context'
             }
@@ -181,95 +251,120 @@ class EnhancedGEESmallPolygonHandler:
             }
             return geometry, method_info
     
-    def method_2_multi_scale_sampling(self, geometry: ee.Geometry, 
-                                     image_collection: ee.ImageCollection) -> Tuple[Dict, Dict]:
-        """
-        Method 2: Multi-scale sampling with different reducers and scales
+    def _adaptive_plan(self, geometry: ee.Geometry, polygon_area_m2: float, mean_img: ee.Image):
+        """Server-side expression for adaptive buffering and a finisher turning its value into (result, info)"""
+        buffered_geometry, method_info = self.method_1_adaptive_buffering(geometry, polygon_area_m2)
+        
+        expr = mean_img.reduceRegion(
+            reducer=self._r_mean,
+            geometry=buffered_geometry,
+            scale=self.era5_native_resolution,
+            maxPixels=1e9,
+            bestEffort=True
+        )
+        
+        def finish(result):
+            method_info['result'] = result
+            return result, method_info
         
-        Scientific validity: High
-        - Uses multiple spatial scales to capture variability
-        - Provides uncertainty estimates
-        - Robust against single-point failures
-        """
+        return expr, finish
+    
+    def _do_adaptive(self, geometry: ee.Geometry, polygon_area_m2: float,
+                     mean_img: ee.Image) -> Tuple[Dict, Dict]:
+        """Run adaptive buffering and reduce the mean composite over the buffered geometry"""
+        expr, finish = self._adaptive_plan(geometry, polygon_area_m2, mean_img)
+        return finish(expr.getInfo())
+    
+    def _multi_scale_plan(self, geometry: ee.Geometry, mean_img: ee.Image):
+        """Server-side expression for multi-scale sampling and its client-side finisher"""
         scales = [
             self.era5_native_resolution,      # Native resolution
             self.era5_native_resolution // 2, # Half resolution (upsampled)
             self.era5_native_resolution * 2   # Double resolution (downsampled)
         ]
         
-        reducers = [
-            ee.Reducer.mean(),
-            ee.Reducer.median(),
-            ee.Reducer.mode()
-        ]
+        # Reducer names match the output suffixes of the combined reducer
+        reducer_names = ["mean", "median", "mode"]
         
-        results = {}
+        band = 'surface_solar_radiation_downwards_sum'
         
-        for scale in scales:
-            for reducer in reducers:
-                try:
-                    result = (image_collection.mean()
-                             .select(['surface_solar_radiation_downwards_sum'])
-                             .reduceRegion(
-                                 reducer=reducer,
-                                 geometry=geometry,
-                                 scale=scale,
-                                 maxPixels=1e9,
-                                 bestEffort=True
-                             ).getInfo())
-                    
-                    key = f"scale_{scale}_reducer_{reducer.getInfo()['type']}"
-                    results[key] = result.get('surface_solar_radiation_downwards_sum')
-                    
-                except Exception as e:
-                    print(f"⚠️ Multi-scale sampling failed for scale {scale}: {str(e)}")
-        
-        # Calculate statistics from valid results
-        valid_values = [v for v in results.values() if v is not None and v > 0]
+        # Every scale/reducer pair is evaluated server-side in a single expression
+        expr = ee.List(scales).map(
+            lambda s: mean_img.reduceRegion(
+                reducer=self._r_combined,
+                geometry=geometry,
+                scale=ee.Number(s),
+                maxPixels=1e9,
+                bestEffort=True
+            )
+        )
         
-        if valid_values:
-            method_info = {
-                'method': 'multi_scale_sampling',
-                'mean_value': np.mean(valid_values),
-                'std_value': np.std(valid_values),
-                'min_value': np.min(valid_values),
-                'max_value': np.max(valid_values),
-                'n_valid_samples': len(valid_values),
-                'coefficient_of_variation': np.std(valid_values) / np.mean(valid_values) if np.mean(valid_values) > 0 else 0,
-                'scientific_validity': 'High',
-                'rationale': 'Multiple scales and reducers provide robust estimates with uncertainty quantification'
-            }
+        def finish(per_scale):
+            results = {}
+            for scale, result in zip(scales, per_scale):
+                for name in reducer_names:
+                    results[f"scale_{scale}_reducer_{name}"] = result.get(f"{band}_{name}")
             
-            return {'surface_solar_radiation_downwards_sum': np.mean(valid_values)}, method_info
-        else:
-            return {}, {'method': 'multi_scale_sampling', 'status': 'failed', 'scientific_validity': 'N/A'}
+            # Calculate statistics from valid results
+            valid_values = [v for v in results.values() if v is not None and v > 0]
+            
+            if valid_values:
+                # At most nine samples: plain Python statistics beat numpy's array overhead
+                mu = statistics.fmean(valid_values)
+                sigma = statistics.pstdev(valid_values, mu)
+                method_info = {
+                    'method': 'multi_scale_sampling',
+                    'mean_value': mu,
+                    'std_value': sigma,
+                    'min_value': min(valid_values),
+                    'max_value': max(valid_values),
+                    'n_valid_samples': len(valid_values),
+                    'coefficient_of_variation': sigma / mu if mu > 0 else 0,
+                    'scientific_validity': 'High',
+                    'rationale': 'Multiple scales and reducers provide robust estimates with uncertainty quantification'
+                }
+                
+                return {'surface_solar_radiation_downwards_sum': mu}, method_info
+            else:
+                return {}, {'method': 'multi_scale_sampling', 'status': 'failed', 'scientific_validity': 'N/A'}
+        
+        return expr, finish
     
-    def method_3_spatial_interpolation(self, geometry: ee.Geometry, 
-                                      image_collection: ee.ImageCollection) -> Tuple[Dict, Dict]:
+    def method_2_multi_scale_sampling(self, geometry: ee.Geometry, 
+                                     mean_img: ee.Image) -> Tuple[Dict, Dict]:
         """
-        Method 3: Spatial interpolation using resampling
+        Method 2: Multi-scale sampling with different reducers and scales
         
-        Scientific validity: Medium-High
-        - Uses bilinear interpolation to create finer resolution data
-        - Maintains spatial relationships
-        - May introduce some smoothing artifacts
+        Scientific validity: High
+        - Uses multiple spatial scales to capture variability
+        - Provides uncertainty estimates
+        - Robust against single-point failures
         """
+        expr, finish = self._multi_scale_plan(geometry, mean_img)
         try:
-            # Resample to finer resolution using bilinear interpolation
-            fine_scale = self.era5_native_resolution // 4  # 4x finer resolution
-            
-            resampled_image = (image_collection.mean()
-                              .select(['surface_solar_radiation_downwards_sum'])
-                              .resample('bilinear'))
-            
-            result = resampled_image.reduceRegion(
-                reducer=ee.Reducer.mean(),
-                geometry=geometry,
-                scale=fine_scale,
-                maxPixels=1e9,
-                bestEffort=True
-            ).getInfo()
-            
+            per_scale = expr.getInfo()
+        except Exception as e:
+            logger.debug("⚠️ Multi-scale sampling failed: %s", e)
+            per_scale = []
+        
+        return finish(per_scale)
+    
+    def _interpolation_plan(self, geometry: ee.Geometry, mean_img: ee.Image):
+        """Server-side expression for spatial interpolation and its client-side finisher"""
+        # Resample to finer resolution using bilinear interpolation
+        fine_scale = self.era5_native_resolution // 4  # 4x finer resolution
+        
+        resampled_image = mean_img.resample('bilinear')
+        
+        expr = resampled_image.reduceRegion(
+            reducer=self._r_mean,
+            geometry=geometry,
+            scale=fine_scale,
+            maxPixels=1e9,
+            bestEffort=True
+        )
+        
+        def finish(result):
             method_info = {
                 'method': 'spatial_interpolation',
                 'original_scale': self.era5_native_resolution,
@@ -280,34 +375,44 @@ class EnhancedGEESmallPolygonHandler:
             }
             
             return result, method_info
-            
-        except Exception as e:
-            print(f"⚠️ Spatial interpolation failed: {str(e)}")
-            return {}, {'method': 'spatial_interpolation', 'status': 'failed', 'scientific_validity': 'N/A'}
+        
+        return expr, finish
     
-    def method_4_nearest_neighbor_sampling(self, geometry: ee.Geometry, 
-                                          image_collection: ee.ImageCollection) -> Tuple[Dict, Dict]:
+    def method_3_spatial_interpolation(self, geometry: ee.Geometry, 
+                                      mean_img: ee.Image) -> Tuple[Dict, Dict]:
         """
-        Method 4: Nearest neighbor sampling using sample()
+        Method 3: Spatial interpolation using resampling
         
-        Scientific validity: Medium
-        - Guarantees a value by sampling the nearest pixel
-        - May not be representative of the exact location
-        - Useful as a fallback method
+        Scientific validity: Medium-High
+        - Uses bilinear interpolation to create finer resolution data
+        - Maintains spatial relationships
+        - May introduce some smoothing artifacts
         """
         try:
-            # Get centroid of polygon
-            centroid = geometry.centroid(maxError=1)
+            expr, finish = self._interpolation_plan(geometry, mean_img)
+            return finish(expr.getInfo())
             
-            # Sample the nearest pixel
-            sample_result = (image_collection.mean()
-                           .select(['surface_solar_radiation_downwards_sum'])
-                           .sample(region=centroid, scale=self.era5_native_resolution, numPixels=1)
-                           .first()
-                           .getInfo())
-            
-            if sample_result and 'properties' in sample_result:
-                value = sample_result['properties'].get('surface_solar_radiation_downwards_sum')
+        except Exception as e:
+            logger.debug("⚠️ Spatial interpolation failed: %s", e)
+            return {}, {'method': 'spatial_interpolation', 'status': 'failed', 'scientific_validity': 'N/A'}
+    
+    def _nearest_neighbor_plan(self, geometry: ee.Geometry, mean_img: ee.Image):
+        """Server-side expression for nearest neighbor sampling and its client-side finisher"""
+        # Get centroid of polygon
+        centroid = geometry.centroid(maxError=1)
+        
+        # Read the pixel under the centroid as a plain dictionary (no FeatureCollection)
+        expr = mean_img.reduceRegion(
+            reducer=self._r_first,
+            geometry=centroid,
+            scale=self.era5_native_resolution,
+            maxPixels=1,
+            bestEffort=True
+        )
+        
+        def finish(sample_result):
+            if sample_result:
+                value = sample_result.get('surface_solar_radiation_downwards_sum')
                 
                 method_info = {
                     'method': 'nearest_neighbor_sampling',
@@ -318,11 +423,47 @@ class EnhancedGEESmallPolygonHandler:
                 
                 return {'surface_solar_radiation_downwards_sum': value}, method_info
             
+            return {}, {'method': 'nearest_neighbor_sampling', 'status': 'failed', 'scientific_validity': 'N/A'}
+        
+        return expr, finish
+    
+    def method_4_nearest_neighbor_sampling(self, geometry: ee.Geometry, 
+                                          mean_img: ee.Image) -> Tuple[Dict, Dict]:
+        """
+        Method 4: Nearest neighbor sampling using sample()
+        
+        Scientific validity: Medium
+        - Guarantees a value by sampling the nearest pixel
+        - May not be representative of the exact location
+        - Useful as a fallback method
+        """
+        try:
+            expr, finish = self._nearest_neighbor_plan(geometry, mean_img)
+            return finish(expr.getInfo())
+            
         except Exception as e:
-            print(f"⚠️ Nearest neighbor sampling failed: {str(e)}")
+            logger.debug("⚠️ Nearest neighbor sampling failed: %s", e)
         
         return {}, {'method': 'nearest_neighbor_sampling', 'status': 'failed', 'scientific_validity': 'N/A'}
     
+    def _resolve_date_range(self, start_date: Optional[str], end_date: Optional[str]) -> Tuple[str, str]:
+        """Fill in the default window (180 to 30 days ago) for missing dates"""
+        if not start_date:
+            start_date = (datetime.now() - timedelta(days=180)).strftime('%Y-%m-%d')
+        if not end_date:
+            end_date = (datetime.now() - timedelta(days=30)).strftime('%Y-%m-%d')
+        return start_date, end_date
+    
+    def _mean_solar_image(self, geometry: ee.Geometry, start_date: str, end_date: str) -> ee.Image:
+        """Mean solar radiation composite over the date range, shared by every method"""
+        # Filter ERA5 data
+        era5_filtered = (self.era5_daily
+                       .filterDate(start_date, end_date)
+                       .filterBounds(geometry))
+        
+        # Single mean composite shared by every method, so GEE sees one graph
+        return era5_filtered.mean().select(['surface_solar_radiation_downwards_sum'])
+    
     def get_enhanced_era5_data(self, polygon_coords: List[Tuple[float, float]], 
                               start_date: str = None, end_date: str = None,
                               preferred_method: str = 'adaptive_buffering') -> Dict:
@@ -340,71 +481,58 @@ class EnhancedGEESmallPolygonHandler:
         """
         try:
             # Set default date range
-            if not start_date:
-                start_date = (datetime.now() - timedelta(days=180)).strftime('%Y-%m-%d')
-            if not end_date:
-                end_date = (datetime.now() - timedelta(days=30)).strftime('%Y-%m-%d')
+            start_date, end_date = self._resolve_date_range(start_date, end_date)
             
             # Create geometry and calculate area
             geometry = self.create_polygon_geometry(polygon_coords)
-            polygon_area_m2 = self.calculate_polygon_area(geometry)
+            polygon_area_m2 = self.calculate_polygon_area(polygon_coords)
+            coords_key = tuple(map(tuple, polygon_coords))
             
-            # Filter ERA5 data
-            era5_filtered = (self.era5_daily
-                           .filterDate(start_date, end_date)
-                           .filterBounds(geometry))
+            # Cheap local check before any GEE request
+            if polygon_area_m2 < self.min_polygon_area_m2:
+                return {
+                    'success': False,
+                    'error': f'Polygon below minimum area ({polygon_area_m2:.1f} m² < {self.min_polygon_area_m2} m²)',
+                    'polygon_area_m2': polygon_area_m2,
+                    'methods_tried': [],
+                    'recommendations': [
+                        f"Polygon is very small (<{self.min_polygon_area_m2} m²). Consider using a representative point instead.",
+                        "Check polygon coordinates"
+                    ]
+                }
             
-            print(f"📐 Polygon area: {polygon_area_m2:.1f} m² (ERA5 pixel: ~{self.era5_native_resolution**2:.0f} m²)")
+            mean_img = self._mean_solar_image(geometry, start_date, end_date)
+            
+            logger.info("📐 Polygon area: %.1f m² (ERA5 pixel: ~%.0f m²)", polygon_area_m2, self.era5_pixel_area_m2)
             
             # Method selection and execution
-            methods_to_try = []
+            methods_to_try = self._FALLBACK_ORDERS.get(preferred_method,
+                                                       self._FALLBACK_ORDERS['adaptive_buffering'])
             
-            if preferred_method == 'adaptive_buffering':
-                methods_to_try = ['adaptive_buffering', 'multi_scale', 'interpolation', 'nearest_neighbor']
-            elif preferred_method == 'multi_scale':
-                methods_to_try = ['multi_scale', 'adaptive_buffering', 'interpolation', 'nearest_neighbor']
-            elif preferred_method == 'interpolation':
-                methods_to_try = ['interpolation', 'adaptive_buffering', 'multi_scale', 'nearest_neighbor']
-            else:
-                methods_to_try = ['nearest_neighbor', 'adaptive_buffering', 'multi_scale', 'interpolation']
+            # Native-scale samples of a polygon this small are all null, so skip them as a fallback
+            if polygon_area_m2 < self.era5_pixel_area_m2 * 0.001 and preferred_method != 'multi_scale':
+                methods_to_try = [m for m in methods_to_try if m != 'multi_scale']
+            
+            # Evaluate the whole cascade in one request; the loop below then reads the cache
+            self._prefetch_methods(coords_key, start_date, end_date, methods_to_try,
+                                   geometry, polygon_area_m2, mean_img)
             
             successful_result = None
             method_results = []
             
             for method in methods_to_try:
-                print(f"🔄 Trying method: {method}")
+                logger.debug("🔄 Trying method: %s", method)
                 
                 try:
-                    if method == 'adaptive_buffering':
-                        buffered_geometry, method_info = self.method_1_adaptive_buffering(geometry, polygon_area_m2)
-                        
-                        result = (era5_filtered.mean()
-                                .select(['surface_solar_radiation_downwards_sum'])
-                                .reduceRegion(
-                                    reducer=ee.Reducer.mean(),
-                                    geometry=buffered_geometry,
-                                    scale=self.era5_native_resolution,
-                                    maxPixels=1e9,
-                                    bestEffort=True
-                                ).getInfo())
-                        
-                        method_info['result'] = result
-                        
-                    elif method == 'multi_scale':
-                        result, method_info = self.method_2_multi_scale_sampling(geometry, era5_filtered)
-                        
-                    elif method == 'interpolation':
-                        result, method_info = self.method_3_spatial_interpolation(geometry, era5_filtered)
-                        
-                    elif method == 'nearest_neighbor':
-                        result, method_info = self.method_4_nearest_neighbor_sampling(geometry, era5_filtered)
-                    
+                    cache_key = (coords_key, start_date, end_date, method)
+                    result, method_info = self._cached_method_result(
+                        cache_key, geometry, polygon_area_m2, mean_img)
                     method_results.append(method_info)
                     
                     # Check if we got a valid result
                     solar_value = result.get('surface_solar_radiation_downwards_sum')
                     if solar_value is not None and solar_value > 0:
-                        print(f"✅ Method {method} successful: {solar_value:.1f} J/m²")
+                        logger.info("✅ Method %s successful: %.1f J/m²", method, solar_value)
                         successful_result = {
                             'raw_solar_radiation_j_m2': solar_value,
                             'method_used': method,
@@ -412,10 +540,10 @@ class EnhancedGEESmallPolygonHandler:
                         }
                         break
                     else:
-                        print(f"⚠️ Method {method} returned null/zero value")
+                        logger.info("⚠️ Method %s returned null/zero value", method)
                         
                 except Exception as e:
-                    print(f"❌ Method {method} failed: {str(e)}")
+                    logger.warning("❌ Method %s failed: %s", method, e)
                     method_results.append({
                         'method': method,
                         'status': 'failed',
@@ -463,6 +591,99 @@ class EnhancedGEESmallPolygonHandler:
                 'recommendations': ['Check polygon coordinates', 'Verify date range', 'Check GEE authentication']
             }
     
+    def _cached_method_result(self, cache_key: Tuple, geometry: ee.Geometry,
+                              polygon_area_m2: float, mean_img: ee.Image) -> Tuple[Dict, Dict]:
+        """Run a retrieval method at most once per (coords, dates, method), sharing the result"""
+        while True:
+            with self._method_cache_lock:
+                future, is_owner = self._reserve_method_future(cache_key)
+            
+            if is_owner:
+                try:
+                    self._store_method_result(
+                        cache_key, future,
+                        self._method_dispatch[cache_key[-1]](geometry, polygon_area_m2, mean_img)
+                    )
+                except Exception as e:
+                    self._release_method_future(cache_key, future, e)
+            
+            try:
+                result, method_info = future.result()
+            except Exception:
+                if is_owner:
+                    raise
+                # The request we waited on (e.g. a batch) failed; retry with our own
+                continue
+            return result, dict(method_info)
+    
+    def _reserve_method_future(self, cache_key: Tuple) -> Tuple[Future, bool]:
+        """Get the cached Future for cache_key or register a new one; call with the cache lock held"""
+        future = self._method_cache.get(cache_key)
+        if future is not None:
+            self._method_cache.move_to_end(cache_key)
+            return future, False
+        
+        future = self._method_cache[cache_key] = Future()
+        if len(self._method_cache) > self._method_cache_size:
+            self._method_cache.popitem(last=False)
+        return future, True
+    
+    def _store_method_result(self, cache_key: Tuple, future: Future, outcome: Tuple[Dict, Dict]):
+        """
+        Resolve a reserved Future with a method's (result, method_info)
+        
+        Methods report their own errors as status 'failed'; those outcomes still
+        reach the current callers but are dropped from the cache, so a transient
+        GEE error is retried on the next call instead of being replayed.
+        """
+        if outcome[1].get('status') == 'failed':
+            with self._method_cache_lock:
+                if self._method_cache.get(cache_key) is future:
+                    del self._method_cache[cache_key]
+        future.set_result(outcome)
+    
+    def _release_method_future(self, cache_key: Tuple, future: Future, error: Exception):
+        """Fail a reserved Future without caching the failure, so a later call retries the request"""
+        with self._method_cache_lock:
+            if self._method_cache.get(cache_key) is future:
+                del self._method_cache[cache_key]
+        future.set_exception(error)
+    
+    def _prefetch_methods(self, coords_key: Tuple, start_date: str, end_date: str, methods: List[str],
+                          geometry: ee.Geometry, polygon_area_m2: float, mean_img: ee.Image):
+        """
+        Evaluate every uncached method's expression in a single GEE request and fill the cache
+        
+        If the batch fails, the reservations are dropped and the cascade falls back to
+        one request per method, so a single bad expression cannot fail the others.
+        """
+        with self._method_cache_lock:
+            reserved = {}
+            for method in methods:
+                cache_key = (coords_key, start_date, end_date, method)
+                future, is_owner = self._reserve_method_future(cache_key)
+                if is_owner:
+                    reserved[method] = (cache_key, future)
+        
+        if not reserved:
+            return
+        
+        try:
+            plans = {method: self._method_plans[method](geometry, polygon_area_m2, mean_img)
+                     for method in reserved}
+            values = ee.List([plans[method][0] for method in reserved]).getInfo()
+        except Exception as e:
+            logger.debug("⚠️ Batched method evaluation failed, using per-method requests: %s", e)
+            for cache_key, future in reserved.values():
+                self._release_method_future(cache_key, future, e)
+            return
+        
+        for (method, (cache_key, future)), value in zip(reserved.items(), values):
+            try:
+                self._store_method_result(cache_key, future, plans[method][1](value))
+            except Exception as e:
+                self._release_method_future(cache_key, future, e)
+    
     def _generate_recommendations(self, polygon_area_m2: float, method_results: List[Dict]) -> List[str]:
         """Generate recommendations based on failure analysis"""
         recommendations = []
@@ -470,7 +691,7 @@ class EnhancedGEESmallPolygonHandler:
         if polygon_area_m2 < 100:
             recommendations.append("Polygon is very small (<100 m²). Consider using a representative point instead.")
         
-        if polygon_area_m2 < self.era5_native_resolution ** 2 * 0.01:
+        if polygon_area_m2 < self.era5_pixel_area_m2 * 0.01:
             recommendations.append("Polygon is <1% of ERA5 pixel size. Results may not be spatially representative.")
         
         failed_methods = [r for r in method_results if r.get('status') == 'failed']
@@ -488,26 +709,44 @@ class EnhancedGEESmallPolygonHandler:
         Compare all methods for the same polygon to assess consistency
         """
         methods = ['adaptive_buffering', 'multi_scale', 'interpolation', 'nearest_neighbor']
-        results = {}
+        logger.info("🔍 Testing methods: %s", ', '.join(methods))
+        
+        # Fuse all four methods into one server-side request up front; the cascades
+        # below then read every result from the method cache
+        try:
+            start_date, end_date = self._resolve_date_range(start_date, end_date)
+            polygon_area_m2 = self.calculate_polygon_area(polygon_coords)
+            if polygon_area_m2 >= self.min_polygon_area_m2:
+                geometry = self.create_polygon_geometry(polygon_coords)
+                self._prefetch_methods(tuple(map(tuple, polygon_coords)), start_date, end_date, methods,
+                                       geometry, polygon_area_m2,
+                                       self._mean_solar_image(geometry, start_date, end_date))
+        except Exception as e:
+            logger.debug("⚠️ Fused method comparison failed, running cascades individually: %s", e)
         
-        for method in methods:
-            print(f"\n🔍 Testing method: {method}")
-            result = self.get_enhanced_era5_data(polygon_coords, start_date, end_date, method)
-            results[method] = result
+        # If the fused request failed the cascades hit GEE themselves, so keep them concurrent
+        with ThreadPoolExecutor(max_workers=len(methods)) as executor:
+            futures = {method: executor.submit(self.get_enhanced_era5_data,
+                                               polygon_coords, start_date, end_date, method)
+                       for method in methods}
+            results = {method: future.result() for method, future in futures.items()}
         
         # Analyze consistency
         successful_results = {k: v for k, v in results.items() if v.get('success', False)}
         
         if len(successful_results) > 1:
             ghi_values = [r['ghi_kwh_per_m2_day'] for r in successful_results.values()]
+            mean_ghi = statistics.fmean(ghi_values)
+            std_ghi = statistics.pstdev(ghi_values, mean_ghi)
+            cv = std_ghi / mean_ghi
             consistency_analysis = {
-                'mean_ghi': np.mean(ghi_values),
-                'std_ghi': np.std(ghi_values),
-                'coefficient_of_variation': np.std(ghi_values) / np.mean(ghi_values),
-                'min_ghi': np.min(ghi_values),
-                'max_ghi': np.max(ghi_values),
-                'range_ghi': np.max(ghi_values) - np.min(ghi_values),
-                'consistency_rating': 'High' if np.std(ghi_values) / np.mean(ghi_values) < 0.1 else 'Medium' if np.std(ghi_values) / np.mean(ghi_values) < 0.2 else 'Low'
+                'mean_ghi': mean_ghi,
+                'std_ghi': std_ghi,
+                'coefficient_of_variation': cv,
+                'min_ghi': min(ghi_values),
+                'max_ghi': max(ghi_values),
+                'range_ghi': max(ghi_values) - min(ghi_values),
+                'consistency_rating': 'High' if cv < 0.1 else 'Medium' if cv < 0.2 else 'Low'
             }
         else:
             consistency_analysis = {'status': 'insufficient_data'}
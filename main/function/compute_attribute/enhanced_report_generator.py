@@ -16,9 +16,16 @@ import sys
 import os
 import json
 import math
+import hashlib
+import logging
+import functools
+import threading
 import numpy as np
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Dict, List, Tuple, Optional, Any
+from itertools import islice
+from typing import Dict, List, Tuple, Optional, Any, Iterable, TextIO
 
 # Add current directory to path for imports
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
@@ -31,6 +38,150 @@ try:
 except ImportError as e:
     print(f"Import error: {e}. Some features may not be available.")
 
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import diskcache
+    DISKCACHE_AVAILABLE = True
+except ImportError:
+    DISKCACHE_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Default location of the persistent analyze_rooftop_potential cache
+DEFAULT_DISK_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'solsat', 'irradiance')
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True, fastmath=True)
+    def _shoelace_numba(xy):
+        """Shoelace area (deg²) and mean latitude of an open (N, 2) ring; the closing edge is implied"""
+        n = xy.shape[0]
+        x0 = xy[0, 0]
+        y0 = xy[0, 1]
+        s = 0.0
+        lat = 0.0
+        for i in range(n):
+            j = i + 1 if i + 1 < n else 0
+            # Relative to the first vertex so the products don't cancel
+            s += (xy[i, 0] - x0) * (xy[j, 1] - y0) - (xy[j, 0] - x0) * (xy[i, 1] - y0)
+            lat += xy[i, 1]
+        return abs(s) / 2.0, lat / n
+
+
+@functools.lru_cache(maxsize=1024)
+def _meters_per_deg_lon(lat_q: float) -> float:
+    """Meters per degree of longitude at a latitude rounded to 3 decimals (~100 m)"""
+    return 111320 * math.cos(math.radians(lat_q))
+
+
+class _SharedConstants(dict):
+    """Read-only dict shared by reference across every rooftop result of a run"""
+    
+    def _read_only(self, *args, **kwargs):
+        raise TypeError("shared report constants are read-only")
+    
+    __setitem__ = __delitem__ = clear = pop = popitem = setdefault = update = _read_only
+    
+    def __reduce__(self):
+        return (_SharedConstants, (dict(self),))
+
+
+class _LRUCache(OrderedDict):
+    """Dict bounded to maxsize entries, evicting the least recently used (thread-safe get/set)"""
+    
+    def __init__(self, maxsize: int):
+        self._lock = threading.Lock()
+        super().__init__()
+        self.maxsize = maxsize
+    
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                self.move_to_end(key)
+                return super().__getitem__(key)
+            except KeyError:
+                return default
+    
+    def __setitem__(self, key, value):
+        with self._lock:
+            super().__setitem__(key, value)
+            self.move_to_end(key)
+            if len(self) > self.maxsize:
+                self.popitem(last=False)
+    
+    def __reduce__(self):
+        return (_LRUCache, (self.maxsize,), None, None, iter(self.items()))
+
+
+def _float32_payload(obj: Any) -> Any:
+    """
+    Copy of a result dict with every float (coordinates excepted) replaced by
+    the shortest decimal that round-trips its float32 value, e.g. 481.5830012
+    becomes 481.583, so the JSON is shorter and stays plain json-serializable;
+    the ±5% accuracy of the analysis is far inside float32 precision. Sums
+    should be taken before this rounding. _SharedConstants are kept by reference.
+    """
+    if isinstance(obj, _SharedConstants):
+        return obj
+    if isinstance(obj, dict):
+        return {k: v if k == 'coordinates' else _float32_payload(v) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [_float32_payload(v) for v in obj]
+    if isinstance(obj, float):
+        return float(str(np.float32(obj)))
+    return obj
+
+
+def _json_default(o):
+    """json.dumps fallback converting numpy scalars and arrays to native Python types"""
+    if isinstance(o, np.float32):
+        # Round-trip through the shortest float32 repr so the JSON stays short
+        return float(str(o))
+    if isinstance(o, np.generic):
+        return o.item()
+    if isinstance(o, np.ndarray):
+        return o.tolist()
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+
+def _dumps(obj: Any, indent: bool = False) -> str:
+    """Serialize report content with orjson when available (numpy-aware), else the stdlib json"""
+    if ORJSON_AVAILABLE:
+        option = orjson.OPT_SERIALIZE_NUMPY | (orjson.OPT_INDENT_2 if indent else 0)
+        return orjson.dumps(obj, default=_json_default, option=option).decode('utf-8')
+    return json.dumps(obj, default=_json_default, indent=2 if indent else None)
+
+
+# Per-process generator and shared report inputs for process-pool rooftop workers
+_ROOFTOP_WORKER: Optional[Tuple[Any, datetime, float]] = None
+
+
+def _init_rooftop_worker(generator: 'EnhancedSolarReportGenerator', now: datetime, seasonal_factor: float):
+    """Process-pool initializer: keep one generator per worker instead of pickling it per task"""
+    global _ROOFTOP_WORKER
+    _ROOFTOP_WORKER = (generator, now, seasonal_factor)
+
+
+def _analyze_rooftop_in_worker(task: Tuple) -> Dict[str, Any]:
+    """Run analyze_single_rooftop for one (coords, roof_area, solar_geometry, centroid) task"""
+    generator, now, seasonal_factor = _ROOFTOP_WORKER
+    coords, roof_area, solar_geometry, centroid = task
+    return generator.analyze_single_rooftop(coords, roof_area=roof_area, now=now,
+                                            seasonal_factor=seasonal_factor,
+                                            solar_geometry=solar_geometry, centroid=centroid,
+                                            compact=False)
+
+
 class EnhancedSolarReportGenerator:
     """
     Enhanced Solar Report Generator for comprehensive rooftop analysis
@@ -43,23 +194,43 @@ class EnhancedSolarReportGenerator:
     - Quality assessment and metadata
     """
     
-    def __init__(self, use_satellite_data: bool = True, thailand_optimized: bool = True):
+    # Typical GHI split into direct and diffuse components for Thailand
+    DNI_RATIO = 0.85
+    DHI_RATIO = 0.15
+    
+    # Angular frequency of the seasonal cycle (radians per day)
+    _SEASONAL_OMEGA = 2 * math.pi / 365
+    
+    # Batches smaller than this are analyzed serially; pool start-up would dominate
+    PARALLEL_MIN_ROOFTOPS = 64
+    
+    # Max points per bulk ERA5 request (GEE caps getInfo on collections at 5000 elements)
+    BULK_ERA5_MAX_POINTS = 5000
+    
+    # Centroid cells kept in the in-memory ERA5 satellite record cache
+    IRRADIANCE_CACHE_SIZE = 4096
+    
+    def __init__(self, use_satellite_data: bool = True, thailand_optimized: bool = True,
+                 max_workers: Optional[int] = None,
+                 disk_cache_dir: Optional[str] = DEFAULT_DISK_CACHE_DIR):
         """
         Initialize the report generator
         
         Args:
             use_satellite_data: Whether to use ERA5 satellite data
             thailand_optimized: Whether to use Thailand-specific parameters
+            max_workers: Pool size for large batches (default: CPU count, 1 disables)
+            disk_cache_dir: Directory of the persistent rooftop analysis cache
+                (None disables it; also disabled when diskcache is not installed)
         """
         self.use_satellite_data = use_satellite_data
         self.thailand_optimized = thailand_optimized
+        self.max_workers = max_workers
+        self.disk_cache_dir = disk_cache_dir if DISKCACHE_AVAILABLE else None
         
-        # Initialize enhanced solar system
-        self.solar_system = EnhancedSolarSystem(
-            use_satellite_data=use_satellite_data,
-            use_adaptive_buffering=True,
-            thailand_optimized=thailand_optimized
-        )
+        # Enhanced solar system and disk cache, created on first use (and once per pool worker)
+        self._solar_system = None
+        self._disk_cache = None
         
         # Thailand-specific economic parameters
         self.economic_params = {
@@ -77,6 +248,38 @@ class EnhancedSolarReportGenerator:
             'dc_ac_ratio': 1.2                       # DC to AC ratio
         }
         
+        # Per-rooftop constants folded once from economic_params
+        params = self.economic_params
+        self._peak_sun_hours = 5.0       # Peak sun hours for Thailand (typical range 4.5-5.5)
+        self._temperature_factor = 0.95  # 5% loss due to temperature in Thailand
+        self._usable_area_factor = 0.75  # 75% of roof area is usable
+        self._daily_energy_coeff = (self._peak_sun_hours * params['system_efficiency'] *
+                                    params['inverter_efficiency'] * self._temperature_factor)
+        self._monthly_coeff = self._daily_energy_coeff * 30.44  # Average days per month
+        self._yearly_coeff = self._daily_energy_coeff * 365
+        self._panels_per_m2 = self._usable_area_factor / params['panel_area_m2']
+        self._equipment_cost_per_kw = 1000 * params['panel_cost_per_watt']
+        self._cost_per_kw = self._equipment_cost_per_kw * (1 + params['installation_cost_multiplier'])
+        
+        # Blocks identical for every rooftop, built once and referenced from each result
+        self._panel_spec_const = _SharedConstants(_float32_payload({
+            'power_rating_w': params['panel_power_rating'],
+            'area_m2': params['panel_area_m2'],
+            'efficiency': params['system_efficiency']
+        }))
+        self._financial_assumptions_const = _SharedConstants(_float32_payload({
+            'electricity_rate_thb_kwh': params['electricity_rate_thb_per_kwh'],
+            'maintenance_rate': params['maintenance_rate_annual'],
+            'system_lifetime_years': params['system_lifetime_years'],
+            'discount_rate': params['discount_rate']
+        }))
+        
+        # ERA5 satellite records per centroid cell, keyed by (lat, lon) rounded to
+        # 3 decimals (~100 m) and date; bulk-prefetched or taken from the first
+        # rooftop analyzed in the cell. Only this orientation-independent part is
+        # shared, the roof-specific POA and shading are computed per polygon.
+        self._era5_prefetch = _LRUCache(self.IRRADIANCE_CACHE_SIZE)
+        
         # Color palette for visualization
         self.color_palettes = {
             'excellent': ['#00FF00', '#FFFFFF'],      # Green for excellent potential
@@ -85,6 +288,32 @@ class EnhancedSolarReportGenerator:
             'poor': ['#FF0000', '#FFFFFF']            # Red for poor potential
         }
     
+    @property
+    def solar_system(self) -> 'EnhancedSolarSystem':
+        """Enhanced solar system, initialized lazily"""
+        if self._solar_system is None:
+            self._solar_system = EnhancedSolarSystem(
+                use_satellite_data=self.use_satellite_data,
+                use_adaptive_buffering=True,
+                thailand_optimized=self.thailand_optimized
+            )
+        return self._solar_system
+    
+    @property
+    def disk_cache(self) -> Optional['diskcache.Cache']:
+        """Persistent rooftop analysis cache, opened lazily (None when disabled)"""
+        if self._disk_cache is None and self.disk_cache_dir:
+            self._disk_cache = diskcache.Cache(self.disk_cache_dir)
+        return self._disk_cache
+    
+    def __getstate__(self) -> Dict[str, Any]:
+        """Pickle without the solar system (GEE clients, locks), disk cache handle or in-memory caches"""
+        state = self.__dict__.copy()
+        state['_solar_system'] = None
+        state['_disk_cache'] = None
+        state['_era5_prefetch'] = _LRUCache(self.IRRADIANCE_CACHE_SIZE)
+        return state
+    
     def calculate_polygon_area_shoelace(self, coords: List[Tuple[float, float]]) -> float:
         """
         Calculate polygon area using Shoelace formula with proper coordinate conversion
@@ -95,30 +324,167 @@ class EnhancedSolarReportGenerator:
         """
         if len(coords) < 3:
             return 0.0
+        return self.calculate_polygon_area_arr(np.asarray(coords, dtype=np.float64)[:, :2])
+    
+    def calculate_polygon_area_arr(self, pts: np.ndarray) -> float:
+        """Shoelace area in m² of an (N, 2) float64 (lon, lat) vertex array"""
+        if len(pts) < 3:
+            return 0.0
         
-        # Ensure polygon is closed
-        if coords[0] != coords[-1]:
-            coords = coords + [coords[0]]
-        
-        # Shoelace formula in degrees
-        area_deg2 = 0.0
-        for i in range(len(coords) - 1):
-            area_deg2 += coords[i][0] * coords[i + 1][1]
-            area_deg2 -= coords[i + 1][0] * coords[i][1]
-        area_deg2 = abs(area_deg2) / 2.0
-        
-        # Convert to square meters (approximate for small areas)
-        # Use centroid latitude for conversion factor
-        lat_sum = sum(coord[1] for coord in coords[:-1])
-        avg_lat = lat_sum / (len(coords) - 1)
+        # Open ring of vertices; the closing edge is implied by the roll below. A
+        # repeated closing vertex adds nothing to the area but would count twice in
+        # the centroid latitude, so it is dropped to keep avg_lat the open-ring mean
+        if np.array_equal(pts[0], pts[-1]):
+            pts = pts[:-1]
+        if NUMBA_AVAILABLE:
+            # Fused area + centroid-latitude loop
+            area_deg2, avg_lat = _shoelace_numba(np.ascontiguousarray(pts))
+        else:
+            # Shift to the first vertex so the cross products don't cancel catastrophically
+            x = pts[:, 0] - pts[0, 0]
+            y = pts[:, 1] - pts[0, 1]
+            
+            # Shoelace formula in degrees
+            area_deg2 = 0.5 * abs(np.dot(x, np.roll(y, -1)) - np.dot(y, np.roll(x, -1)))
+            
+            # Use centroid latitude for conversion factor
+            avg_lat = pts[:, 1].mean()
         
+        # Convert to square meters (approximate for small areas); rooftops in a
+        # batch share latitudes to 3 decimals, so the cosine comes from a cache
         meters_per_degree_lat = 111320  # Approximately constant
-        meters_per_degree_lon = 111320 * math.cos(math.radians(avg_lat))
+        meters_per_degree_lon = _meters_per_deg_lon(round(float(avg_lat), 3))
         
         area_m2 = area_deg2 * meters_per_degree_lat * meters_per_degree_lon
-        return area_m2
+        return float(area_m2)
+    
+    @staticmethod
+    def _pack_rings(rooftop_coords_list: List[List[Tuple[float, float]]]
+                    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Validate rooftops once at ingestion and pack them as open rings
+        
+        Every rooftop must have at least 3 distinct (lon, lat) vertices. A closing
+        vertex equal to the first one is dropped here, so the batch kernels can
+        assume open rings and run without per-polygon checks. Returns the packed
+        (M, 2) vertices, per-rooftop start offsets and lengths, and a mask of the
+        rooftops that arrived closed.
+        """
+        rings = []
+        closed = np.zeros(len(rooftop_coords_list), dtype=bool)
+        for i, coords in enumerate(rooftop_coords_list):
+            pts = np.asarray(coords, dtype=np.float64)
+            if pts.ndim != 2 or pts.shape[1] < 2:
+                raise ValueError(f"Rooftop {i}: expected a list of (lon, lat) vertices")
+            pts = pts[:, :2]
+            if len(pts) > 1 and np.array_equal(pts[0], pts[-1]):
+                pts = pts[:-1]
+                closed[i] = True
+            if len(pts) < 3:
+                raise ValueError(f"Rooftop {i}: a polygon needs at least 3 distinct vertices")
+            rings.append(pts)
+        
+        lengths = np.array([len(pts) for pts in rings], dtype=np.intp)
+        starts = np.zeros_like(lengths)
+        np.cumsum(lengths[:-1], out=starts[1:])
+        xy = np.concatenate(rings) if rings else np.empty((0, 2))
+        return xy, starts, lengths, closed
+    
+    @staticmethod
+    def _areas_from_rings(xy: np.ndarray, starts: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+        """Shoelace areas (m²) of packed open rings from _pack_rings"""
+        if not len(lengths):
+            return np.zeros(0)
+        
+        # Next vertex of each vertex, wrapping the last one back to its polygon's start
+        nxt = np.arange(1, len(xy) + 1)
+        nxt[starts + lengths - 1] = starts
+        
+        # Shift each polygon to its first vertex so the cross products don't cancel
+        local = xy - np.repeat(xy[starts], lengths, axis=0)
+        cross = local[:, 0] * local[nxt, 1] - local[nxt, 0] * local[:, 1]
+        area_deg2 = 0.5 * np.abs(np.add.reduceat(cross, starts))
+        avg_lat = np.add.reduceat(xy[:, 1], starts) / lengths
+        
+        # Cosine of each distinct latitude (3 decimals, as in the scalar path) only once
+        lat_q, lat_index = np.unique(np.round(avg_lat, 3), return_inverse=True)
+        cos_table = np.cos(np.radians(lat_q))
+        return area_deg2 * 111320 * 111320 * cos_table[lat_index]
+    
+    @staticmethod
+    def _centroids_from_rings(xy: np.ndarray, starts: np.ndarray, lengths: np.ndarray,
+                              closed: np.ndarray) -> np.ndarray:
+        """(N, 2) vertex means of the rooftops as given, counting a closing vertex as the input did"""
+        if not len(lengths):
+            return np.empty((0, 2))
+        sums = np.add.reduceat(xy, starts, axis=0)
+        sums[closed] += xy[starts[closed]]
+        return sums / (lengths + closed)[:, None]
     
-    def calculate_solar_irradiance_enhanced(self, coords: List[Tuple[float, float]]) -> Dict[str, Any]:
+    def calculate_polygon_areas_batch(self, rooftop_coords_list: List[List[Tuple[float, float]]]) -> np.ndarray:
+        """
+        Calculate the Shoelace area of every rooftop in one vectorized pass
+        
+        Metadata: Same result as calculate_polygon_area_shoelace per polygon. All
+        vertices are packed into one (M, 2) array with per-polygon start offsets so
+        the cross products and latitude sums run as single ufunc chains.
+        """
+        return self._areas_from_rings(*self._pack_rings(rooftop_coords_list)[:3])
+    
+    def calculate_centroids_batch(self, rooftop_coords_list: List[List[Tuple[float, float]]]) -> np.ndarray:
+        """(N, 2) array of (lon, lat) vertex means, matching calculate_solar_irradiance_enhanced"""
+        return self._centroids_from_rings(*self._pack_rings(rooftop_coords_list))
+    
+    def prefetch_irradiance(self, rooftop_coords_list: List[List[Tuple[float, float]]],
+                            now: Optional[datetime] = None,
+                            centroids: Optional[np.ndarray] = None) -> int:
+        """
+        Fetch ERA5 GHI for every rooftop centroid cell in bulk
+        
+        Metadata: Collects the distinct ~100 m centroid cells not yet cached and
+        samples ERA5 at all of them with one GEESolarDataRetriever request (per
+        BULK_ERA5_MAX_POINTS cells), so per-rooftop irradiance looks the value up
+        instead of issuing its own GEE query. Returns the number of cells fetched.
+        """
+        if not self.use_satellite_data:
+            return 0
+        calculator = getattr(self.solar_system, 'rooftop_calculator', None)
+        retriever = getattr(calculator, 'gee_retriever', None)
+        if retriever is None:
+            return 0
+        
+        if now is None:
+            now = datetime.now()
+        if centroids is None:
+            centroids = self.calculate_centroids_batch(rooftop_coords_list)
+        
+        # Distinct (lat, lon) cells still missing for today
+        today = now.date()
+        cells = {(round(lat, 3), round(lon, 3)) for lon, lat in centroids.tolist()}
+        missing = [(lat, lon) for lat, lon in sorted(cells)
+                   if (lat, lon, today) not in self._era5_prefetch]
+        
+        fetched = 0
+        for start in range(0, len(missing), self.BULK_ERA5_MAX_POINTS):
+            batch = missing[start:start + self.BULK_ERA5_MAX_POINTS]
+            values = retriever.get_solar_irradiance_points([(lon, lat) for lat, lon in batch])
+            if values is None:
+                continue
+            for (lat, lon), ghi_kwh_per_day in zip(batch, values):
+                if ghi_kwh_per_day:
+                    self._era5_prefetch[(lat, lon, today)] = calculator.satellite_data_from_daily_ghi(
+                        ghi_kwh_per_day, 'ERA5_Bulk')
+                    fetched += 1
+        
+        if fetched:
+            logger.info("📡 Prefetched ERA5 irradiance for %d centroid cells in bulk", fetched)
+        return fetched
+    
+    def calculate_solar_irradiance_enhanced(self, coords: List[Tuple[float, float]],
+                                            now: Optional[datetime] = None,
+                                            solar_calc: Optional['EnhancedRooftopCalculator'] = None,
+                                            seasonal_factor: Optional[float] = None,
+                                            solar_geometry: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
         """
         Calculate enhanced solar irradiance using scientific algorithms
         
@@ -127,46 +493,83 @@ class EnhancedSolarReportGenerator:
         2. Ineichen-Perez clear sky model for atmospheric effects
         3. ERA5 satellite data with adaptive buffering for small polygons
         4. Kasten-Young air mass formula for accuracy
+        
+        now, solar_calc, seasonal_factor and the precomputed solar_geometry
+        (elevation, azimuth, air_mass) are shared per report by
+        process_solar_analysis; they are derived here when omitted.
         """
-        # Get centroid for calculations
-        centroid_lon = sum(coord[0] for coord in coords) / len(coords)
-        centroid_lat = sum(coord[1] for coord in coords) / len(coords)
+        pts = np.asarray(coords, dtype=np.float64)[:, :2]
+        return self.calculate_solar_irradiance_arr(pts, pts.mean(axis=0), now, solar_calc, seasonal_factor,
+                                                   solar_geometry, coords=coords)
+    
+    def calculate_solar_irradiance_arr(self, pts: np.ndarray, centroid: np.ndarray,
+                                       now: Optional[datetime] = None,
+                                       solar_calc: Optional['EnhancedRooftopCalculator'] = None,
+                                       seasonal_factor: Optional[float] = None,
+                                       solar_geometry: Optional[Dict[str, float]] = None,
+                                       coords: Optional[List[Tuple[float, float]]] = None) -> Dict[str, Any]:
+        """
+        calculate_solar_irradiance_enhanced for a pre-cast (N, 2) vertex array
+        and its (lon, lat) centroid; coords is the original vertex list handed
+        to the solar system and defaults to pts.
+        """
+        if now is None:
+            now = datetime.now()
+        if coords is None:
+            coords = pts
+        centroid_lon, centroid_lat = float(centroid[0]), float(centroid[1])
         
-        # Use enhanced solar system for comprehensive analysis
-        analysis = self.solar_system.analyze_rooftop_potential(
-            polygon_coords=coords,
-            monthly_consumption_kwh=600  # Default consumption for calculations
-        )
+        # Rooftops within ~100 m share ERA5 pixels, so they share the cell's satellite
+        # record; everything roof-specific is computed for this polygon
+        cell_key = (round(centroid_lat, 3), round(centroid_lon, 3), now.date())
+        return self._irradiance_for_centroid(centroid_lat, centroid_lon, coords, now, solar_calc,
+                                             seasonal_factor, solar_geometry, cell_key=cell_key)
+    
+    def _irradiance_for_centroid(self, centroid_lat: float, centroid_lon: float,
+                                 coords: List[Tuple[float, float]], now: datetime,
+                                 solar_calc: Optional['EnhancedRooftopCalculator'],
+                                 seasonal_factor: Optional[float],
+                                 solar_geometry: Optional[Dict[str, float]] = None,
+                                 cell_key: Optional[Tuple] = None) -> Dict[str, Any]:
+        """
+        Irradiance analysis of one rooftop, reusing the satellite record of its
+        centroid cell (cell_key) and recording it there when this rooftop fetched it
+        """
+        if solar_geometry is None:
+            if solar_calc is None:
+                solar_calc = self._solar_position_calculator()
+            solar_pos = solar_calc.solar_position_michalsky(centroid_lat, centroid_lon, now)
+            solar_geometry = {
+                'elevation': solar_pos['elevation'],
+                'azimuth': solar_pos['azimuth'],
+                'air_mass': solar_calc.air_mass_kasten_young(solar_pos['zenith'])
+            }
+        if seasonal_factor is None:
+            seasonal_factor = self.seasonal_factor(now)
         
-        if 'irradiance_analysis' in analysis:
-            irradiance = analysis['irradiance_analysis']
-            
+        # Only the irradiance stage of the enhanced solar system is needed here;
+        # panel sizing, energy and economics are computed by this class
+        satellite_data = self._era5_prefetch.get(cell_key) if cell_key is not None else None
+        irradiance = self._cached_irradiance(coords, (centroid_lon, centroid_lat), now, satellite_data)
+        if (satellite_data is None and cell_key is not None and irradiance
+                and irradiance.get('satellite_data')):
+            self._era5_prefetch[cell_key] = irradiance['satellite_data']
+        
+        if irradiance:
             # Extract enhanced irradiance data
             ghi = irradiance.get('final_poa_irradiance', 500)  # W/m²
             
             # Calculate DNI and DHI from GHI (typical ratios for Thailand)
-            dni = ghi * 0.85  # Direct Normal Irradiance
-            dhi = ghi * 0.15  # Diffuse Horizontal Irradiance
-            
-            # Calculate solar position for current time
-            now = datetime.now()
-            solar_calc = EnhancedRooftopCalculator()
-            solar_pos = solar_calc.solar_position_michalsky(centroid_lat, centroid_lon, now)
-            
-            # Calculate air mass
-            air_mass = solar_calc.air_mass_kasten_young(solar_pos['zenith'])
-            
-            # Seasonal factor (Thailand has less seasonal variation)
-            day_of_year = now.timetuple().tm_yday
-            seasonal_factor = 1.0 + 0.1 * math.cos(2 * math.pi * (day_of_year - 172) / 365)
+            dni = ghi * self.DNI_RATIO  # Direct Normal Irradiance
+            dhi = ghi * self.DHI_RATIO  # Diffuse Horizontal Irradiance
             
             return {
                 'ghi': ghi,
                 'dni': dni,
                 'dhi': dhi,
-                'elevation_angle': solar_pos['elevation'],
-                'azimuth_angle': solar_pos['azimuth'],
-                'air_mass': air_mass,
+                'elevation_angle': solar_geometry['elevation'],
+                'azimuth_angle': solar_geometry['azimuth'],
+                'air_mass': solar_geometry['air_mass'],
                 'seasonal_factor': seasonal_factor,
                 'data_source': irradiance.get('method_used', 'Enhanced_Calculation'),
                 'scientific_validity': irradiance.get('scientific_validity', 'High'),
@@ -187,6 +590,45 @@ class EnhancedSolarReportGenerator:
                 'satellite_data_used': False
             }
     
+    def _cached_irradiance(self, coords: List[Tuple[float, float]], centroid: Tuple[float, float],
+                           now: datetime,
+                           satellite_data: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        """
+        solar_system.compute_irradiance_only memoized on disk by polygon, date
+        and data source, so re-runs over unchanged rooftops skip ERA5 and the
+        solar-position work entirely
+        """
+        cache = self.disk_cache
+        if cache is None:
+            return self.solar_system.compute_irradiance_only(coords, satellite_data, centroid)
+        
+        polygon_hash = hashlib.sha1(np.asarray(coords, dtype=np.float64).tobytes()).hexdigest()
+        key = (f"irradiance:{polygon_hash}:{now.date().isoformat()}:"
+               f"{'satellite' if self.use_satellite_data else 'model'}")
+        irradiance = cache.get(key)
+        if irradiance is None:
+            irradiance = self.solar_system.compute_irradiance_only(coords, satellite_data, centroid)
+            # Don't persist failures, or the clear-sky fallback of a failed satellite
+            # fetch under the satellite key, so they are retried on the next run
+            if irradiance and (not self.use_satellite_data or self._satellite_used(irradiance)):
+                cache.set(key, irradiance)
+        return irradiance
+    
+    @staticmethod
+    def _satellite_used(irradiance: Dict[str, Any]) -> bool:
+        """Whether an irradiance result was computed from satellite data"""
+        return bool(irradiance.get('satellite_data_used') or irradiance.get('satellite_data'))
+    
+    def _solar_position_calculator(self) -> 'EnhancedRooftopCalculator':
+        """Calculator used only for solar position and air mass, so skip its GEE setup"""
+        return EnhancedRooftopCalculator(use_satellite_data=False)
+    
+    @staticmethod
+    def seasonal_factor(now: datetime) -> float:
+        """Seasonal irradiance factor (Thailand has less seasonal variation)"""
+        day_of_year = now.timetuple().tm_yday
+        return 1.0 + 0.1 * math.cos(EnhancedSolarReportGenerator._SEASONAL_OMEGA * (day_of_year - 172))
+    
     def calculate_panel_optimization(self, roof_area_m2: float, ghi: float) -> Dict[str, Any]:
         """
         Calculate optimal panel configuration for the rooftop
@@ -200,11 +642,10 @@ class EnhancedSolarReportGenerator:
         panel_area = self.economic_params['panel_area_m2']        # 2.23 m²
         
         # Usable area calculation (account for spacing, inverters, walkways)
-        usable_area_factor = 0.75  # 75% of roof area is usable
-        usable_area = roof_area_m2 * usable_area_factor
+        usable_area = roof_area_m2 * self._usable_area_factor
         
         # Calculate number of panels that can fit
-        panels_by_area = int(usable_area / panel_area)
+        panels_by_area = int(roof_area_m2 * self._panels_per_m2)
         
         # Calculate total system power
         total_power_kw = (panels_by_area * panel_power) / 1000
@@ -218,11 +659,7 @@ class EnhancedSolarReportGenerator:
             'panel_count': panels_by_area,
             'total_power_kw': total_power_kw,
             'coverage_ratio': coverage_ratio,
-            'panel_specifications': {
-                'power_rating_w': panel_power,
-                'area_m2': panel_area,
-                'efficiency': self.economic_params['system_efficiency']
-            }
+            'panel_specifications': self._panel_spec_const
         }
     
     def calculate_energy_production(self, panel_config: Dict, irradiance: Dict) -> Dict[str, Any]:
@@ -236,21 +673,15 @@ class EnhancedSolarReportGenerator:
         total_power_kw = panel_config['total_power_kw']
         ghi = irradiance['ghi']
         
-        # Peak sun hours for Thailand (typical range 4.5-5.5)
-        peak_sun_hours = 5.0
-        
-        # System efficiency factors
+        peak_sun_hours = self._peak_sun_hours
         system_efficiency = self.economic_params['system_efficiency']
         inverter_efficiency = self.economic_params['inverter_efficiency']
-        temperature_factor = 0.95  # 5% loss due to temperature in Thailand
-        
-        # Daily energy calculation
-        daily_energy_kwh = (total_power_kw * peak_sun_hours * 
-                           system_efficiency * inverter_efficiency * temperature_factor)
+        temperature_factor = self._temperature_factor
         
-        # Monthly and yearly calculations
-        monthly_energy_kwh = daily_energy_kwh * 30.44  # Average days per month
-        yearly_energy_kwh = daily_energy_kwh * 365
+        # Daily, monthly and yearly energy from the precomputed coefficients
+        daily_energy_kwh = total_power_kw * self._daily_energy_coeff
+        monthly_energy_kwh = total_power_kw * self._monthly_coeff
+        yearly_energy_kwh = total_power_kw * self._yearly_coeff
         
         return {
             'daily_energy_kwh': daily_energy_kwh,
@@ -280,9 +711,9 @@ class EnhancedSolarReportGenerator:
         monthly_energy_kwh = energy_production['monthly_energy_kwh']
         
         # Cost calculations
-        equipment_cost = total_power_kw * 1000 * self.economic_params['panel_cost_per_watt']
-        installation_cost = equipment_cost * self.economic_params['installation_cost_multiplier']
-        total_system_cost = equipment_cost + installation_cost
+        equipment_cost = total_power_kw * self._equipment_cost_per_kw
+        total_system_cost = total_power_kw * self._cost_per_kw
+        installation_cost = total_system_cost - equipment_cost
         
         # Energy value calculations
         electricity_rate = self.economic_params['electricity_rate_thb_per_kwh']
@@ -311,12 +742,7 @@ class EnhancedSolarReportGenerator:
             'monthly_bill_reduction': monthly_bill_reduction,
             'payback_years': payback_years,
             'roi_percentage': roi_percentage,
-            'financial_assumptions': {
-                'electricity_rate_thb_kwh': electricity_rate,
-                'maintenance_rate': self.economic_params['maintenance_rate_annual'],
-                'system_lifetime_years': self.economic_params['system_lifetime_years'],
-                'discount_rate': self.economic_params['discount_rate']
-            }
+            'financial_assumptions': self._financial_assumptions_const
         }
     
     def calculate_solar_potential_score(self, energy_production: Dict, economic: Dict, 
@@ -375,19 +801,40 @@ class EnhancedSolarReportGenerator:
         else:
             return self.color_palettes['poor']
     
-    def analyze_single_rooftop(self, coords: List[Tuple[float, float]]) -> Dict[str, Any]:
+    def analyze_single_rooftop(self, coords: List[Tuple[float, float]],
+                               roof_area: Optional[float] = None,
+                               now: Optional[datetime] = None,
+                               solar_calc: Optional['EnhancedRooftopCalculator'] = None,
+                               seasonal_factor: Optional[float] = None,
+                               solar_geometry: Optional[Dict[str, float]] = None,
+                               centroid: Optional[np.ndarray] = None,
+                               compact: bool = True) -> Dict[str, Any]:
         """
         Analyze a single rooftop and generate comprehensive report
         
         Metadata: Performs complete analysis pipeline for a single rooftop
         including area calculation, solar irradiance analysis, panel optimization,
-        energy production estimates, and economic analysis.
+        energy production estimates, and economic analysis. roof_area, the
+        per-report now/solar_calc/seasonal_factor, solar_geometry and centroid may
+        be passed in when they were already computed for a batch of rooftops.
+        compact=False skips the _float32_payload rounding (the batch path sums
+        the unrounded values first and rounds afterwards).
         """
+        if now is None:
+            now = datetime.now()
+        
+        # One contiguous float64 copy of the vertices shared by every numeric stage
+        pts = np.asarray(coords, dtype=np.float64)[:, :2]
+        if centroid is None:
+            centroid = pts.mean(axis=0)
+        
         # Calculate roof area
-        roof_area = self.calculate_polygon_area_shoelace(coords)
+        if roof_area is None:
+            roof_area = self.calculate_polygon_area_arr(pts)
         
         # Solar irradiance analysis
-        irradiance = self.calculate_solar_irradiance_enhanced(coords)
+        irradiance = self.calculate_solar_irradiance_arr(pts, centroid, now, solar_calc, seasonal_factor,
+                                                         solar_geometry, coords=coords)
         
         # Panel optimization
         panel_config = self.calculate_panel_optimization(roof_area, irradiance['ghi'])
@@ -410,7 +857,7 @@ class EnhancedSolarReportGenerator:
         else:
             data_source = "Enhanced_Calculation"
         
-        return {
+        analysis = {
             'roof_analysis': {
                 'area_m2': roof_area,
                 'coordinates': coords
@@ -432,25 +879,16 @@ class EnhancedSolarReportGenerator:
             'enhanced_features': {
                 'gee_integration': self.use_satellite_data,
                 'data_preference': 'Satellite' if irradiance.get('satellite_data_used') else 'Enhanced',
-                'analysis_timestamp': datetime.now().isoformat(),
+                'analysis_timestamp': now.isoformat(),
                 'scientific_validity': irradiance.get('scientific_validity', 'High'),
                 'adaptive_buffering_used': irradiance.get('method_used') == 'adaptive_buffering'
             }
         }
+        return _float32_payload(analysis) if compact else analysis
     
-    def process_solar_analysis(self, rooftop_coords_list: List[List[Tuple[float, float]]],
-                                    monthly_consumption_kwh: float = 600) -> Dict[str, Any]:
-        """
-        Generate comprehensive report for multiple rooftops
-        
-        Metadata: Creates a complete analysis report following the structure of
-        demo_enhanced_mock_report.json with detailed metadata for each component.
-        Includes individual rooftop analyses and summary statistics.
-        """
-        print(f"🚀 Generating comprehensive solar analysis report for {len(rooftop_coords_list)} rooftops...")
-        
-        # Analysis configuration
-        analysis_config = {
+    def _analysis_config(self, monthly_consumption_kwh: float) -> Dict[str, Any]:
+        """Analysis configuration block of the report"""
+        return {
             'gee_available': self.use_satellite_data,
             'prefer_gee_data': self.use_satellite_data,
             'monthly_consumption_kwh': monthly_consumption_kwh,
@@ -462,85 +900,287 @@ class EnhancedSolarReportGenerator:
                 'adaptive_buffering': True
             }
         }
+    
+    @staticmethod
+    def _report_metadata() -> Dict[str, Any]:
+        """Metadata block of the report"""
+        return {
+            'report_generated': datetime.now().isoformat(),
+            'generator_version': '2.0.0',
+            'scientific_methods': {
+                'solar_position_algorithm': 'Michalsky (1988) - Astronomical Almanac algorithm',
+                'clear_sky_model': 'Ineichen-Perez (2002) - Linke turbidity formulation',
+                'air_mass_formula': 'Kasten-Young (1989) - Revised optical air mass',
+                'adaptive_buffering': 'ERA5 small polygon best practices',
+                'area_calculation': 'Shoelace formula with coordinate conversion'
+            },
+            'data_sources': {
+                'satellite_data': 'ERA5 Land Daily Aggregated (ECMWF)',
+                'atmospheric_parameters': 'Thailand-optimized tropical climate',
+                'economic_parameters': 'Thailand electricity market 2025'
+            },
+            'quality_assurance': {
+                'coordinate_validation': True,
+                'area_calculation_accuracy': '±5%',
+                'irradiance_model_accuracy': '±10% under clear sky',
+                'economic_assumptions': 'Conservative estimates'
+            }
+        }
+    
+    def _analyze_rooftop_chunk(self, rooftop_coords_list: List[List[Tuple[float, float]]],
+                               now: datetime, seasonal_factor: float,
+                               solar_calc: 'EnhancedRooftopCalculator',
+                               start_index: int = 0,
+                               total: Optional[int] = None) -> Tuple[List[Dict[str, Any]], np.ndarray, int]:
+        """
+        Analyze a chunk of rooftops sharing one batched geometry pass
         
-        # Analyze each rooftop
-        rooftop_analyses = []
-        for i, coords in enumerate(rooftop_coords_list):
-            print(f"📊 Analyzing rooftop {i+1}/{len(rooftop_coords_list)}...")
-            analysis = self.analyze_single_rooftop(coords)
-            rooftop_analyses.append(analysis)
-        
-        # Calculate summary statistics
-        total_roof_area = sum(r['roof_analysis']['area_m2'] for r in rooftop_analyses)
-        total_panels = sum(r['panel_optimization']['panel_count'] for r in rooftop_analyses)
-        total_power_kw = sum(r['panel_optimization']['total_power_kw'] for r in rooftop_analyses)
-        total_yearly_energy = sum(r['energy_production']['yearly_energy_kwh'] for r in rooftop_analyses)
-        total_monthly_savings = sum(r['economic_analysis']['monthly_bill_reduction'] for r in rooftop_analyses)
-        
-        # Solar score statistics
-        solar_scores = [r['solar_potential_score'] for r in rooftop_analyses]
-        avg_solar_score = np.mean(solar_scores)
-        solar_score_std = np.std(solar_scores)
+        Returns the per-rooftop analyses, their summary columns (area, panels,
+        power, yearly energy, monthly savings, solar score) and the number of
+        analyses that used GEE data.
+        """
+        # Validate and pack the rooftops once; the batch kernels below assume open rings
+        xy, starts, lengths, closed = self._pack_rings(rooftop_coords_list)
         
-        # Data source distribution
-        gee_count = sum(1 for r in rooftop_analyses if 'GEE' in r['data_source'])
-        enhanced_count = len(rooftop_analyses) - gee_count
+        # Roof areas for every rooftop in one vectorized pass
+        roof_areas = self._areas_from_rings(xy, starts, lengths)
         
-        data_source_distribution = {
-            'GEE_ERA5': gee_count,
-            'Enhanced_Calculation': enhanced_count
-        }
+        # Solar position and air mass for every rooftop centroid in one batch
+        centroids = self._centroids_from_rings(xy, starts, lengths, closed)
+        solar_pos = solar_calc.solar_position_michalsky_vec(centroids[:, 1], centroids[:, 0], now)
+        air_mass = solar_calc.air_mass_kasten_young_vec(solar_pos['zenith'])
+        
+        # One ERA5 request for all centroid cells instead of one per rooftop
+        self.prefetch_irradiance(rooftop_coords_list, now, centroids)
+        
+        tasks = [
+            (coords, float(roof_areas[i]),
+             {
+                 'elevation': float(solar_pos['elevation'][i]),
+                 'azimuth': float(solar_pos['azimuth'][i]),
+                 'air_mass': float(air_mass[i])
+             },
+             centroids[i])
+            for i, coords in enumerate(rooftop_coords_list)
+        ]
+        
+        # Analyze each rooftop, collecting the summary columns as we go;
+        # progress is logged about every 1% of the batch rather than per rooftop
+        rooftop_analyses = []
+        summary_columns = np.empty((len(rooftop_coords_list), 6), dtype=np.float64)
+        gee_count = 0
+        log_every = max(1, (total or len(rooftop_coords_list)) // 100)
+        for i, analysis in enumerate(self._map_rooftops(tasks, now, seasonal_factor, solar_calc)):
+            done = start_index + i + 1
+            if done % log_every == 0 or i == len(tasks) - 1:
+                logger.info("📊 Analyzed rooftop %d%s", done, f"/{total}" if total is not None else "")
+            summary_columns[i] = (
+                analysis['roof_analysis']['area_m2'],
+                analysis['panel_optimization']['panel_count'],
+                analysis['panel_optimization']['total_power_kw'],
+                analysis['energy_production']['yearly_energy_kwh'],
+                analysis['economic_analysis']['monthly_bill_reduction'],
+                analysis['solar_potential_score']
+            )
+            if 'GEE' in analysis['data_source']:
+                gee_count += 1
+            rooftop_analyses.append(_float32_payload(analysis))
+        
+        return rooftop_analyses, summary_columns, gee_count
+    
+    def _map_rooftops(self, tasks: List[Tuple], now: datetime, seasonal_factor: float,
+                      solar_calc: 'EnhancedRooftopCalculator') -> Iterable[Dict[str, Any]]:
+        """
+        Yield unrounded (compact=False) analyze_single_rooftop results for
+        (coords, roof_area, solar_geometry, centroid) tasks in order. Large
+        batches fan out over a process pool, or a thread pool when satellite
+        data is used since those requests are IO-bound.
+        """
+        workers = self.max_workers or os.cpu_count() or 1
+        if workers <= 1 or len(tasks) < self.PARALLEL_MIN_ROOFTOPS:
+            for coords, roof_area, solar_geometry, centroid in tasks:
+                yield self.analyze_single_rooftop(coords, roof_area=roof_area, now=now,
+                                                  solar_calc=solar_calc, seasonal_factor=seasonal_factor,
+                                                  solar_geometry=solar_geometry, centroid=centroid,
+                                                  compact=False)
+            return
         
-        gee_usage_percentage = (gee_count / len(rooftop_analyses)) * 100
+        if self.use_satellite_data:
+            def analyze(task):
+                coords, roof_area, solar_geometry, centroid = task
+                return self.analyze_single_rooftop(coords, roof_area=roof_area, now=now,
+                                                   solar_calc=solar_calc, seasonal_factor=seasonal_factor,
+                                                   solar_geometry=solar_geometry, centroid=centroid,
+                                                   compact=False)
+            
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                yield from executor.map(analyze, tasks)
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_rooftop_worker,
+                                     initargs=(self, now, seasonal_factor)) as executor:
+                yield from executor.map(_analyze_rooftop_in_worker, tasks, chunksize=32)
+    
+    @staticmethod
+    def _quality_counts(solar_scores: np.ndarray) -> np.ndarray:
+        """Rooftop counts in the low (< 40), medium (40-70) and high (>= 70) score buckets"""
+        return np.bincount(np.searchsorted([40, 70], solar_scores, side='right'), minlength=3)
+    
+    @staticmethod
+    def _summary_statistics(totals: np.ndarray, rooftop_count: int, avg_solar_score: float,
+                            solar_score_std: float, quality_counts: np.ndarray,
+                            gee_count: int) -> Dict[str, Any]:
+        """Summary statistics block of the report from already-reduced totals"""
+        total_roof_area, total_panels, total_power_kw, total_yearly_energy, total_monthly_savings = (
+            totals.tolist()
+        )
+        low_quality, medium_quality, high_quality = quality_counts.tolist()
+        gee_usage_percentage = (gee_count / rooftop_count) * 100 if rooftop_count else 0.0
         
-        summary_statistics = {
+        return {
             'total_roof_area_m2': total_roof_area,
-            'total_recommended_panels': total_panels,
+            'total_recommended_panels': int(total_panels),
             'total_system_power_kw': total_power_kw,
             'total_yearly_energy_kwh': total_yearly_energy,
             'total_monthly_savings_thb': total_monthly_savings,
-            'average_solar_score': avg_solar_score,
-            'solar_score_std': solar_score_std,
-            'data_source_distribution': data_source_distribution,
+            'average_solar_score': float(avg_solar_score),
+            'solar_score_std': float(solar_score_std),
+            'data_source_distribution': {
+                'GEE_ERA5': gee_count,
+                'Enhanced_Calculation': rooftop_count - gee_count
+            },
             'gee_data_usage_percentage': gee_usage_percentage,
             'analysis_quality': {
-                'high_quality_analyses': sum(1 for r in rooftop_analyses if r['solar_potential_score'] >= 70),
-                'medium_quality_analyses': sum(1 for r in rooftop_analyses if 40 <= r['solar_potential_score'] < 70),
-                'low_quality_analyses': sum(1 for r in rooftop_analyses if r['solar_potential_score'] < 40)
+                'high_quality_analyses': high_quality,
+                'medium_quality_analyses': medium_quality,
+                'low_quality_analyses': low_quality
             }
         }
+    
+    def process_solar_analysis(self, rooftop_coords_list: List[List[Tuple[float, float]]],
+                                    monthly_consumption_kwh: float = 600) -> Dict[str, Any]:
+        """
+        Generate comprehensive report for multiple rooftops
+        
+        Metadata: Creates a complete analysis report following the structure of
+        demo_enhanced_mock_report.json with detailed metadata for each component.
+        Includes individual rooftop analyses and summary statistics. Each rooftop
+        needs at least 3 distinct vertices (open or closed ring); rooftops are
+        validated once up front and a ValueError names the first bad one.
+        """
+        print(f"🚀 Generating comprehensive solar analysis report for {len(rooftop_coords_list)} rooftops...")
+        
+        # Time, seasonal factor and solar-position calculator are shared by every rooftop
+        now = datetime.now()
+        seasonal_factor = self.seasonal_factor(now)
+        solar_calc = self._solar_position_calculator()
+        
+        rooftop_analyses, summary_columns, gee_count = self._analyze_rooftop_chunk(
+            rooftop_coords_list, now, seasonal_factor, solar_calc, total=len(rooftop_coords_list)
+        )
+        
+        # Calculate summary statistics in one column-wise reduction
+        solar_scores = summary_columns[:, 5]
+        avg_solar_score = np.mean(solar_scores)
+        summary_statistics = self._summary_statistics(
+            summary_columns[:, :5].sum(axis=0), len(rooftop_analyses), avg_solar_score,
+            np.std(solar_scores), self._quality_counts(solar_scores), gee_count
+        )
         
         # Generate final report
         report = {
             'total_rooftops': len(rooftop_coords_list),
-            'analysis_config': analysis_config,
+            'analysis_config': self._analysis_config(monthly_consumption_kwh),
             'rooftop_analyses': rooftop_analyses,
             'summary_statistics': summary_statistics,
-            'metadata': {
-                'report_generated': datetime.now().isoformat(),
-                'generator_version': '2.0.0',
-                'scientific_methods': {
-                    'solar_position_algorithm': 'Michalsky (1988) - Astronomical Almanac algorithm',
-                    'clear_sky_model': 'Ineichen-Perez (2002) - Linke turbidity formulation',
-                    'air_mass_formula': 'Kasten-Young (1989) - Revised optical air mass',
-                    'adaptive_buffering': 'ERA5 small polygon best practices',
-                    'area_calculation': 'Shoelace formula with coordinate conversion'
-                },
-                'data_sources': {
-                    'satellite_data': 'ERA5 Land Daily Aggregated (ECMWF)',
-                    'atmospheric_parameters': 'Thailand-optimized tropical climate',
-                    'economic_parameters': 'Thailand electricity market 2025'
-                },
-                'quality_assurance': {
-                    'coordinate_validation': True,
-                    'area_calculation_accuracy': '±5%',
-                    'irradiance_model_accuracy': '±10% under clear sky',
-                    'economic_assumptions': 'Conservative estimates'
-                }
-            }
+            'metadata': self._report_metadata()
         }
         
         print(f"✅ Report generation completed!")
-        print(f"📈 Summary: {len(rooftop_coords_list)} rooftops, {total_power_kw:.1f} kW total, {avg_solar_score:.1f} avg score")
+        print(f"📈 Summary: {len(rooftop_coords_list)} rooftops, "
+              f"{summary_statistics['total_system_power_kw']:.1f} kW total, {avg_solar_score:.1f} avg score")
+        
+        return report
+    
+    @staticmethod
+    def to_json(report: Dict[str, Any], indent: bool = False) -> str:
+        """Serialize a report from process_solar_analysis to a JSON string"""
+        return _dumps(report, indent=indent)
+    
+    def process_solar_analysis_streaming(self, rooftop_coords_iter: Iterable[List[Tuple[float, float]]],
+                                         out_fp: TextIO,
+                                         monthly_consumption_kwh: float = 600,
+                                         chunk_size: int = 256) -> Dict[str, Any]:
+        """
+        Generate the report straight into an open text file, one rooftop at a time
+        
+        Metadata: Same report content as process_solar_analysis, but each rooftop
+        analysis is written to out_fp as soon as it is produced and then dropped,
+        so at most chunk_size analyses are held in memory. Rooftops are read
+        lazily from rooftop_coords_iter. total_rooftops, summary_statistics and
+        metadata follow the rooftop array in the output, since they are only
+        known at the end. Returns the summary statistics.
+        """
+        print(f"🚀 Streaming solar analysis report...")
+        
+        now = datetime.now()
+        seasonal_factor = self.seasonal_factor(now)
+        solar_calc = self._solar_position_calculator()
+        
+        out_fp.write('{"analysis_config": ')
+        out_fp.write(_dumps(self._analysis_config(monthly_consumption_kwh)))
+        out_fp.write(', "rooftop_analyses": [')
+        
+        # Running totals; score mean and variance are merged chunk by chunk
+        totals = np.zeros(5, dtype=np.float64)
+        quality_counts = np.zeros(3, dtype=np.int64)
+        rooftop_count = 0
+        gee_count = 0
+        score_mean = 0.0
+        score_m2 = 0.0
+        
+        rooftop_iter = iter(rooftop_coords_iter)
+        while True:
+            chunk = list(islice(rooftop_iter, chunk_size))
+            if not chunk:
+                break
+            
+            rooftop_analyses, summary_columns, chunk_gee = self._analyze_rooftop_chunk(
+                chunk, now, seasonal_factor, solar_calc, start_index=rooftop_count
+            )
+            for i, analysis in enumerate(rooftop_analyses):
+                if rooftop_count or i:
+                    out_fp.write(', ')
+                out_fp.write(_dumps(analysis))
+            
+            scores = summary_columns[:, 5]
+            chunk_count = len(scores)
+            chunk_mean = float(scores.mean())
+            merged_count = rooftop_count + chunk_count
+            delta = chunk_mean - score_mean
+            score_mean += delta * chunk_count / merged_count
+            score_m2 += (float(((scores - chunk_mean) ** 2).sum())
+                         + delta * delta * rooftop_count * chunk_count / merged_count)
+            
+            totals += summary_columns[:, :5].sum(axis=0)
+            quality_counts += self._quality_counts(scores)
+            rooftop_count = merged_count
+            gee_count += chunk_gee
+        
+        solar_score_std = math.sqrt(score_m2 / rooftop_count) if rooftop_count else 0.0
+        summary_statistics = self._summary_statistics(
+            totals, rooftop_count, score_mean, solar_score_std, quality_counts, gee_count
+        )
+        
+        out_fp.write('], "total_rooftops": ')
+        out_fp.write(_dumps(rooftop_count))
+        out_fp.write(', "summary_statistics": ')
+        out_fp.write(_dumps(summary_statistics))
+        out_fp.write(', "metadata": ')
+        out_fp.write(_dumps(self._report_metadata()))
+        out_fp.write('}')
+        
+        print(f"✅ Report generation completed!")
+        print(f"📈 Summary: {rooftop_count} rooftops, "
+              f"{summary_statistics['total_system_power_kw']:.1f} kW total, {score_mean:.1f} avg score")
         
-        return report
\ No newline at end of file
+        return summary_statistics
\ No newline at end of file
@@ -21,10 +21,16 @@ Date: 2025
 
 import numpy as np
 import math
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Dict, List, Tuple, Optional
 import sys
 import os
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
 
 # Add path for GEE integration
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'main', 'function'))
@@ -37,11 +43,152 @@ except ImportError:
     GEE_AVAILABLE = False
     print("⚠️ Google Earth Engine not available, using enhanced calculations only")
 
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+
+# Scalar irradiance kernels. Plain floats in, tuples out, so the same bodies run
+# as Python or, when numba is installed, as compiled code.
+
+def _extraterrestrial_kernel(julian_day, solar_constant):
+    """Solar constant scaled by the Earth-Sun distance correction"""
+    day_angle = 2 * math.pi * (julian_day - 1) / 365.25
+    cos_d = math.cos(day_angle)
+    sin_d = math.sin(day_angle)
+    # Double-angle terms from the single-angle ones
+    distance_factor = 1.000110 + 0.034221 * cos_d + 0.001280 * sin_d + \
+                     0.000719 * (2 * cos_d * cos_d - 1) + 0.000077 * (2 * sin_d * cos_d)
+    return solar_constant * distance_factor
+
+
+def _air_mass_kernel(zenith_deg, altitude):
+    """Kasten-Young air mass with pressure correction; 40 below the horizon"""
+    if zenith_deg >= 90:
+        return 40.0
+    pressure_ratio = math.exp(-altitude / 8400)  # Scale height ~8.4 km
+    am = pressure_ratio / (math.cos(math.radians(zenith_deg)) +
+                          0.50572 * (96.07995 - zenith_deg) ** (-1.6364))
+    return max(1.0, am)
+
+
+def _clear_sky_kernel(zenith_deg, air_mass, altitude, linke_turbidity, I0):
+    """Ineichen-Perez clear sky; returns (ghi, dni, dhi, beam transmittance)"""
+    if zenith_deg >= 90:
+        return 0.0, 0.0, 0.0, 0.0
+    
+    cos_zenith = math.cos(math.radians(zenith_deg))
+    
+    # Altitude-dependent coefficients
+    fh1 = math.exp(-altitude / 8000)
+    fh2 = math.exp(-altitude / 1250)
+    cg1 = 5.09e-5 * altitude + 0.868
+    cg2 = 3.92e-5 * altitude + 0.0387
+    
+    ghi = (cg1 * I0 * cos_zenith *
+           math.exp(-cg2 * air_mass * (fh1 + fh2 * (linke_turbidity - 1))) *
+           math.exp(0.01 * air_mass**1.8))
+    
+    # Beam irradiance, capped so the diffuse part stays physical
+    b = 0.664 + 0.163 / fh1
+    dni = b * I0 * math.exp(-0.09 * air_mass * (linke_turbidity - 1))
+    dni = min(dni, ghi * (1 - (0.1 - 0.2 * math.exp(-linke_turbidity)) / (0.1 + 0.882 / fh1)) / cos_zenith)
+    dhi = ghi - dni * cos_zenith
+    return max(0.0, ghi), max(0.0, dni), max(0.0, dhi), dni / I0
+
+
+def _poa_kernel(ghi, dni, dhi, zenith_deg, azimuth_deg, surface_tilt, surface_azimuth, albedo):
+    """Isotropic-sky POA; returns (global, direct, diffuse, reflected, angle_of_incidence)"""
+    if zenith_deg >= 90:
+        return 0.0, 0.0, 0.0, 0.0, 90.0
+    
+    zenith_rad = math.radians(zenith_deg)
+    tilt_rad = math.radians(surface_tilt)
+    cos_tilt = math.cos(tilt_rad)
+    
+    cos_incidence = (math.sin(zenith_rad) * math.sin(tilt_rad) *
+                    math.cos(math.radians(azimuth_deg - surface_azimuth)) +
+                    math.cos(zenith_rad) * cos_tilt)
+    
+    poa_direct = dni * max(0.0, cos_incidence)
+    poa_diffuse = dhi * (1 + cos_tilt) / 2
+    poa_reflected = ghi * albedo * (1 - cos_tilt) / 2
+    poa_global = poa_direct + poa_diffuse + poa_reflected
+    aoi = math.degrees(math.acos(max(0.0, min(1.0, cos_incidence))))
+    return (max(0.0, poa_global), max(0.0, poa_direct), max(0.0, poa_diffuse),
+            max(0.0, poa_reflected), aoi)
+
+
+if NUMBA_AVAILABLE:
+    _extraterrestrial_kernel = njit(cache=True, fastmath=True)(_extraterrestrial_kernel)
+    _air_mass_kernel = njit(cache=True, fastmath=True)(_air_mass_kernel)
+    _clear_sky_kernel = njit(cache=True, fastmath=True)(_clear_sky_kernel)
+    _poa_kernel = njit(cache=True, fastmath=True)(_poa_kernel)
+
+
+def _clear_sky_poa_batch(zenith_deg, azimuth_deg, altitude, linke_turbidity, I0,
+                         surface_tilt, surface_azimuth, albedo):
+    """Air mass -> clear sky -> POA for arrays of sun positions; returns (ghi, dni, dhi, poa_global)"""
+    n = zenith_deg.shape[0]
+    ghi = np.empty(n)
+    dni = np.empty(n)
+    dhi = np.empty(n)
+    poa = np.empty(n)
+    for i in range(n):
+        am = _air_mass_kernel(zenith_deg[i], altitude)
+        g, b, d, _ = _clear_sky_kernel(zenith_deg[i], am, altitude, linke_turbidity, I0)
+        p = _poa_kernel(g, b, d, zenith_deg[i], azimuth_deg[i],
+                        surface_tilt, surface_azimuth, albedo)
+        ghi[i] = g
+        dni[i] = b
+        dhi[i] = d
+        poa[i] = p[0]
+    return ghi, dni, dhi, poa
+
+
+if NUMBA_AVAILABLE:
+    _clear_sky_poa_batch = njit(cache=True, fastmath=True)(_clear_sky_poa_batch)
+
+
+def _as_polygon(coords) -> np.ndarray:
+    """Polygon vertices as a contiguous (N, 2) float64 array (no copy if already one)"""
+    return np.ascontiguousarray(coords, dtype=np.float64).reshape(-1, 2)
+
+
+def _sun_ra_dec(n):
+    """Michalsky right ascension (deg) and declination (rad) for days n since J2000"""
+    L = (280.460 + 0.9856474 * n) % 360
+    g = np.radians((357.528 + 0.9856003 * n) % 360)
+    lambda_sun = np.radians(L + 1.915 * np.sin(g) + 0.020 * np.sin(2 * g))
+    epsilon = np.radians(23.439 - 0.0000004 * n)
+    sin_lambda = np.sin(lambda_sun)
+    alpha = np.arctan2(np.cos(epsilon) * sin_lambda, np.cos(lambda_sun))
+    delta = np.arcsin(np.sin(epsilon) * sin_lambda)
+    return np.degrees(alpha), delta
+
+
+# The ecliptic terms only depend on the whole-day Julian day number, so a daily
+# table over 2020-2040 is exact; dates outside it fall back to _sun_ra_dec.
+_SUN_TABLE_JD0 = 2458850  # 2020-01-01
+_SUN_TABLE_DAYS = 7671    # through 2040-12-31
+_SUN_RA_DEG, _SUN_DEC_RAD = _sun_ra_dec(
+    np.arange(_SUN_TABLE_JD0, _SUN_TABLE_JD0 + _SUN_TABLE_DAYS) - 2451545.0)
+
+
 class EnhancedRooftopCalculator:
     """
     Enhanced calculator for rooftop solar irradiance with satellite integration
     """
     
+    # Points per bulk ERA5 request, and concurrent per-polygon fallbacks
+    BATCH_MAX_POINTS = 5000
+    BATCH_FALLBACK_WORKERS = 8
+    
+    # Satellite records kept per (polygon, day), least recently used evicted first
+    SATELLITE_CACHE_SIZE = 256
+    
     def __init__(self, use_satellite_data: bool = True):
         """
         Initialize the enhanced calculator
@@ -62,6 +209,10 @@ class EnhancedRooftopCalculator:
                 self.use_satellite_data = False
                 print(f"⚠️ Satellite data unavailable: {str(e)}")
         
+        # Satellite records per (polygon, day); they don't depend on orientation or time of day
+        self._satellite_cache: OrderedDict = OrderedDict()
+        self._satellite_cache_lock = threading.Lock()
+        
         # Physical constants
         self.SOLAR_CONSTANT = 1361.0  # W/m² (Solar constant at top of atmosphere)
         self.EARTH_RADIUS = 6371000   # meters
@@ -73,9 +224,15 @@ class EnhancedRooftopCalculator:
             'water_vapor': 2.5,        # cm (typical for tropical climate)
             'aerosol_optical_depth': 0.15,  # Typical for urban Thailand
             'ozone': 0.3,             # atm-cm (tropical ozone)
+            'linke_turbidity': 3.5,   # Humid tropical urban air
             'albedo': 0.2             # Ground reflectance
         }
         
+        # Plain-float copies of the atmospheric parameters for the hot paths
+        self._altitude = float(self.atmospheric_params['altitude'])
+        self._linke_turbidity = float(self.atmospheric_params['linke_turbidity'])
+        self._albedo = float(self.atmospheric_params['albedo'])
+        
         # Rooftop-specific parameters
         self.rooftop_params = {
             'default_tilt': 15,        # degrees (optimal for Thailand latitude)
@@ -92,6 +249,19 @@ class EnhancedRooftopCalculator:
         m = date.month + 12 * a - 3
         return date.day + (153 * m + 2) // 5 + 365 * y + y // 4 - y // 100 + y // 400 - 32045
 
+    @staticmethod
+    def julian_day_vec(t) -> np.ndarray:
+        """
+        Julian day numbers (as julian_day) and clock hours for datetime64-compatible
+        input; returns (jd, hour) arrays
+        """
+        t = np.asarray(t, dtype='datetime64[ns]')
+        day = t.astype('datetime64[D]')
+        # 1970-01-01 is Julian day number 2440588
+        jd = (day - np.datetime64('1970-01-01', 'D')).astype(np.int64) + 2440588
+        hour = (t - day) / np.timedelta64(1, 'h')
+        return jd, hour
+
     def solar_position_michalsky(self, lat: float, lon: float, date: datetime) -> Dict:
         """
         Calculate solar position using Michalsky algorithm
@@ -106,33 +276,25 @@ class EnhancedRooftopCalculator:
         # Time calculations
         hour = date.hour + date.minute / 60.0 + date.second / 3600.0
         
-        # Mean longitude of sun
-        L = (280.460 + 0.9856474 * (jd - 2451545.0)) % 360
-        
-        # Mean anomaly
-        g = math.radians((357.528 + 0.9856003 * (jd - 2451545.0)) % 360)
-        
-        # Ecliptic longitude
-        lambda_sun = math.radians(L + 1.915 * math.sin(g) + 0.020 * math.sin(2 * g))
-        
-        # Obliquity of ecliptic
-        epsilon = math.radians(23.439 - 0.0000004 * (jd - 2451545.0))
-        
-        # Right ascension and declination
-        alpha = math.atan2(math.cos(epsilon) * math.sin(lambda_sun), math.cos(lambda_sun))
-        delta = math.asin(math.sin(epsilon) * math.sin(lambda_sun))
+        # Right ascension and declination of the sun for this day
+        i = jd - _SUN_TABLE_JD0
+        if 0 <= i < _SUN_TABLE_DAYS:
+            alpha_deg = float(_SUN_RA_DEG[i])
+            delta = float(_SUN_DEC_RAD[i])
+        else:
+            alpha_deg, delta = (float(v) for v in _sun_ra_dec(jd - 2451545.0))
         
         # Hour angle
-        H = math.radians(15 * (hour - 12) + lon - math.degrees(alpha))
+        H = math.radians(15 * (hour - 12) + lon - alpha_deg)
         
         # Solar elevation and azimuth
         lat_rad = math.radians(lat)
-        elevation = math.asin(math.sin(lat_rad) * math.sin(delta) + 
-                             math.cos(lat_rad) * math.cos(delta) * math.cos(H))
+        sin_lat = math.sin(lat_rad)
+        cos_lat = math.cos(lat_rad)
+        cos_H = math.cos(H)
+        elevation = math.asin(sin_lat * math.sin(delta) + cos_lat * math.cos(delta) * cos_H)
         
-        azimuth = math.atan2(math.sin(H), 
-                            math.cos(H) * math.sin(lat_rad) - 
-                            math.tan(delta) * math.cos(lat_rad))
+        azimuth = math.atan2(math.sin(H), cos_H * sin_lat - math.tan(delta) * cos_lat)
         
         # Convert to degrees and adjust azimuth
         elevation_deg = math.degrees(elevation)
@@ -150,17 +312,67 @@ class EnhancedRooftopCalculator:
             'julian_day': jd
         }
 
+    def solar_position_michalsky_vec(self, lats: np.ndarray, lons: np.ndarray, date) -> Dict:
+        """
+        Michalsky solar position for arrays of locations and/or instants
+        
+        Same formulation as solar_position_michalsky. date is either a datetime,
+        whose ecliptic terms are then shared by every location, or an array of
+        datetimes / datetime64 values broadcast against lats and lons. Returns a
+        dict of arrays with the same keys.
+        """
+        lats = np.asarray(lats, dtype=np.float64)
+        lons = np.asarray(lons, dtype=np.float64)
+        
+        if isinstance(date, datetime):
+            jd = self.julian_day(date)
+            hour = date.hour + date.minute / 60.0 + date.second / 3600.0
+        else:
+            jd, hour = self.julian_day_vec(date)
+        
+        i = np.asarray(jd) - _SUN_TABLE_JD0
+        if np.all((i >= 0) & (i < _SUN_TABLE_DAYS)):
+            alpha_deg = _SUN_RA_DEG[i]
+            delta = _SUN_DEC_RAD[i]
+        else:
+            alpha_deg, delta = _sun_ra_dec(jd - 2451545.0)
+        
+        H = np.radians(15 * (hour - 12) + lons - alpha_deg)
+        lat_rad = np.radians(lats)
+        sin_lat = np.sin(lat_rad)
+        cos_lat = np.cos(lat_rad)
+        cos_H = np.cos(H)
+        
+        elevation = np.arcsin(sin_lat * np.sin(delta) + cos_lat * np.cos(delta) * cos_H)
+        azimuth = np.arctan2(np.sin(H), cos_H * sin_lat - np.tan(delta) * cos_lat)
+        
+        elevation_deg = np.degrees(elevation)
+        return {
+            'elevation': elevation_deg,
+            'azimuth': (np.degrees(azimuth) + 180) % 360,
+            'zenith': 90 - elevation_deg,
+            'declination': np.degrees(delta),
+            'hour_angle': np.degrees(H),
+            'julian_day': jd
+        }
+
+    def air_mass_kasten_young_vec(self, zenith_deg: np.ndarray, altitude: float = 0) -> np.ndarray:
+        """Kasten-Young air mass for an array of zenith angles (see air_mass_kasten_young)"""
+        zenith_deg = np.asarray(zenith_deg, dtype=np.float64)
+        pressure_ratio = math.exp(-altitude / 8400)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            am = np.asarray(pressure_ratio / (np.cos(np.radians(zenith_deg)) +
+                                              0.50572 * (96.07995 - zenith_deg) ** (-1.6364)))
+        np.maximum(am, 1.0, out=am)
+        # Very large air mass for sun below horizon
+        np.copyto(am, 40.0, where=zenith_deg >= 90)
+        return am
+
     def extraterrestrial_irradiance(self, julian_day: float) -> float:
         """
         Calculate extraterrestrial irradiance with Earth-Sun distance correction
         """
-        # Earth-Sun distance correction factor
-        day_angle = 2 * math.pi * (julian_day - 1) / 365.25
-        distance_factor = 1.000110 + 0.034221 * math.cos(day_angle) + \
-                         0.001280 * math.sin(day_angle) + 0.000719 * math.cos(2 * day_angle) + \
-                         0.000077 * math.sin(2 * day_angle)
-        
-        return self.SOLAR_CONSTANT * distance_factor
+        return _extraterrestrial_kernel(float(julian_day), self.SOLAR_CONSTANT)
 
     def air_mass_kasten_young(self, zenith_deg: float, altitude: float = 0) -> float:
         """
@@ -170,67 +382,37 @@ class EnhancedRooftopCalculator:
         Reference: Kasten, F. and Young, A.T. 1989. "Revised optical air mass 
         tables and approximation formula." Applied Optics 28(22):4735-4738.
         """
-        if zenith_deg >= 90:
-            return 40  # Very large air mass for sun below horizon
-        
-        zenith_rad = math.radians(zenith_deg)
-        
-        # Pressure correction for altitude
-        pressure_ratio = math.exp(-altitude / 8400)  # Scale height ~8.4 km
-        
-        # Kasten-Young formula
-        am = pressure_ratio / (math.cos(zenith_rad) + 
-                              0.50572 * (96.07995 - zenith_deg) ** (-1.6364))
-        
-        return max(1.0, am)
+        return _air_mass_kernel(float(zenith_deg), float(altitude))
 
     def clear_sky_ineichen_perez(self, zenith_deg: float, air_mass: float, 
-                                altitude: float, water_vapor: float, 
-                                aerosol_optical_depth: float, ozone: float) -> Dict:
+                                altitude: float, water_vapor: float = None, 
+                                aerosol_optical_depth: float = None, ozone: float = None,
+                                linke_turbidity: float = None) -> Dict:
         """
         Calculate clear sky irradiance using Ineichen-Perez model
         
+        Atmospheric turbidity enters through the Linke turbidity factor (defaults
+        to atmospheric_params['linke_turbidity']). water_vapor,
+        aerosol_optical_depth and ozone are accepted for backward compatibility
+        and ignored.
+        
         Reference: Ineichen, P. and Perez, R. 2002. "A new airmass independent 
         formulation for the Linke turbidity coefficient." Solar Energy 73(3):151-157.
         """
         if zenith_deg >= 90:
             return {'ghi': 0, 'dni': 0, 'dhi': 0}
         
-        # Extraterrestrial irradiance
-        I0 = self.extraterrestrial_irradiance(1)  # Use average value
-        
-        # Rayleigh optical depth
-        delta_r = 1 / (117.2594 + 1.8169 * air_mass - 0.033454 * air_mass**2 + 
-                      0.00053513 * air_mass**3)
-        
-        # Water vapor absorption
-        w = water_vapor
-        delta_w = 0.2385 * w * air_mass / (1 + 20.07 * w * air_mass)**0.45
-        
-        # Ozone absorption
-        u_o = ozone
-        delta_o = u_o * air_mass * (1 + u_o * air_mass)**(-3) + \
-                 0.0003 * (u_o * air_mass)**2 / (1 + (u_o * air_mass)**1.5)
-        
-        # Aerosol extinction
-        delta_a = aerosol_optical_depth * air_mass
-        
-        # Total atmospheric transmittance
-        T = math.exp(-(delta_r + delta_w + delta_o + delta_a))
-        
-        # Direct normal irradiance
-        dni = I0 * T
-        
-        # Diffuse horizontal irradiance (simplified model)
-        dhi = I0 * math.cos(math.radians(zenith_deg)) * (1 - T) * 0.5
-        
-        # Global horizontal irradiance
-        ghi = dni * math.cos(math.radians(zenith_deg)) + dhi
+        if linke_turbidity is None:
+            linke_turbidity = self._linke_turbidity
         
+        # Extraterrestrial irradiance (average value)
+        I0 = self.extraterrestrial_irradiance(1)
+        ghi, dni, dhi, T = _clear_sky_kernel(float(zenith_deg), float(air_mass), float(altitude),
+                                             float(linke_turbidity), I0)
         return {
-            'ghi': max(0, ghi),
-            'dni': max(0, dni),
-            'dhi': max(0, dhi),
+            'ghi': ghi,
+            'dni': dni,
+            'dhi': dhi,
             'transmittance': T,
             'air_mass': air_mass
         }
@@ -247,36 +429,82 @@ class EnhancedRooftopCalculator:
         if zenith_deg >= 90:
             return {'poa_global': 0, 'poa_direct': 0, 'poa_diffuse': 0, 'poa_reflected': 0}
         
-        # Convert angles to radians
-        zenith_rad = math.radians(zenith_deg)
-        azimuth_rad = math.radians(azimuth_deg)
-        tilt_rad = math.radians(surface_tilt)
-        surface_azimuth_rad = math.radians(surface_azimuth)
-        
-        # Angle of incidence on tilted surface
-        cos_incidence = (math.sin(zenith_rad) * math.sin(tilt_rad) * 
-                        math.cos(azimuth_rad - surface_azimuth_rad) + 
-                        math.cos(zenith_rad) * math.cos(tilt_rad))
-        
-        # Direct component on tilted surface
-        poa_direct = dni * max(0, cos_incidence)
-        
-        # Diffuse component (isotropic sky model - simplified)
-        poa_diffuse = dhi * (1 + math.cos(tilt_rad)) / 2
+        poa_global, poa_direct, poa_diffuse, poa_reflected, aoi = _poa_kernel(
+            float(ghi), float(dni), float(dhi), float(zenith_deg), float(azimuth_deg),
+            float(surface_tilt), float(surface_azimuth), float(albedo))
+        return {
+            'poa_global': poa_global,
+            'poa_direct': poa_direct,
+            'poa_diffuse': poa_diffuse,
+            'poa_reflected': poa_reflected,
+            'angle_of_incidence': aoi
+        }
+
+    def clear_sky_poa_batch(self, zenith_deg: np.ndarray, azimuth_deg: np.ndarray,
+                            surface_tilt: float, surface_azimuth: float) -> Dict:
+        """
+        Clear-sky GHI/DNI/DHI and POA global for arrays of sun positions
         
-        # Reflected component
-        poa_reflected = (ghi * albedo * (1 - math.cos(tilt_rad)) / 2)
+        Same chain as air_mass_kasten_young -> clear_sky_ineichen_perez ->
+        plane_of_array_irradiance with this calculator's atmospheric parameters;
+        compiled to a single-threaded loop when numba is available (fork-safe in
+        worker processes), otherwise the same loop runs in Python.
+        """
+        ghi, dni, dhi, poa = _clear_sky_poa_batch(
+            np.ascontiguousarray(zenith_deg, dtype=np.float64),
+            np.ascontiguousarray(azimuth_deg, dtype=np.float64),
+            self._altitude, self._linke_turbidity, self.extraterrestrial_irradiance(1),
+            float(surface_tilt), float(surface_azimuth), self._albedo)
+        return {'ghi': ghi, 'dni': dni, 'dhi': dhi, 'poa_global': poa}
+
+    def plane_of_array_global_grid(self, ghi, dni, dhi, zenith_deg, azimuth_deg,
+                                   surface_tilt: np.ndarray, surface_azimuth: np.ndarray,
+                                   albedo: float = 0.2, dtype=np.float64) -> np.ndarray:
+        """
+        poa_global of plane_of_array_irradiance for arrays of surface tilts and
+        azimuths (degrees); the irradiance and sun-position arguments may be
+        arrays too, and everything is broadcast together. Angles are resolved in
+        float64; the broadcast arithmetic runs in dtype.
+        """
+        zenith_deg = np.asarray(zenith_deg, dtype=np.float64)
+        night = zenith_deg >= 90
+        zenith_rad = np.radians(zenith_deg)
+        sun_azimuth_rad = np.radians(np.asarray(azimuth_deg, dtype=np.float64))
+        tilt_rad = np.radians(np.asarray(surface_tilt, dtype=np.float64))
+        surface_azimuth_rad = np.radians(np.asarray(surface_azimuth, dtype=np.float64))
+        
+        # Trig runs on each operand before broadcasting, never on the full grid
+        sin_zenith = np.sin(zenith_rad)
+        sin_tilt = np.sin(tilt_rad)
+        components = [
+            sin_zenith * np.cos(sun_azimuth_rad), sin_zenith * np.sin(sun_azimuth_rad), np.cos(zenith_rad),
+            sin_tilt * np.cos(surface_azimuth_rad), sin_tilt * np.sin(surface_azimuth_rad), np.cos(tilt_rad),
+            ghi, dni, dhi
+        ]
+        poa_global = self._poa_from_precomputed(
+            *(np.asarray(c, dtype=dtype) for c in components), albedo
+        )
+        # Sun below the horizon: zero in place rather than branching per element
+        np.copyto(poa_global, 0.0, where=night)
+        return poa_global
+
+    @staticmethod
+    def _poa_from_precomputed(sun_x, sun_y, sun_z, normal_x, normal_y, normal_z,
+                              ghi, dni, dhi, albedo: float) -> np.ndarray:
+        """
+        Isotropic-sky POA global from the sun's unit vector and the surface
+        normal (components broadcast together); normal_z is cos(tilt)
+        """
+        # Angle of incidence on each tilted surface (clamped in place)
+        cos_incidence = np.asarray(sun_x * normal_x + sun_y * normal_y + sun_z * normal_z)
+        np.maximum(cos_incidence, 0, out=cos_incidence)
         
-        # Total plane-of-array irradiance
-        poa_global = poa_direct + poa_diffuse + poa_reflected
+        # Direct + diffuse + reflected, accumulated into one buffer
+        poa_global = np.asarray(dni * cos_incidence)
+        poa_global += dhi * (1 + normal_z) / 2
+        poa_global += ghi * albedo * (1 - normal_z) / 2
         
-        return {
-            'poa_global': max(0, poa_global),
-            'poa_direct': max(0, poa_direct),
-            'poa_diffuse': max(0, poa_diffuse),
-            'poa_reflected': max(0, poa_reflected),
-            'angle_of_incidence': math.degrees(math.acos(max(0, min(1, cos_incidence))))
-        }
+        return np.maximum(poa_global, 0, out=poa_global)
 
     def shading_analysis(self, polygon_coords: List[Tuple[float, float]], 
                         sun_elevation: float, sun_azimuth: float) -> Dict:
@@ -288,48 +516,95 @@ class EnhancedRooftopCalculator:
         if len(polygon_coords) < 3:
             return {'shading_factor': self.rooftop_params['shading_factor']}
         
-        # Estimate roof orientation from longest edge
-        max_length = 0
-        roof_azimuth = 180  # Default south-facing
-        
-        for i in range(len(polygon_coords)):
-            j = (i + 1) % len(polygon_coords)
-            dx = polygon_coords[j][0] - polygon_coords[i][0]
-            dy = polygon_coords[j][1] - polygon_coords[i][1]
-            length = math.sqrt(dx**2 + dy**2)
-            
-            if length > max_length:
-                max_length = length
-                roof_azimuth = math.degrees(math.atan2(dx, dy)) % 360
+        roof_azimuth = self._roof_azimuth(polygon_coords)
+        shading_factor, azimuth_diff, elevation_factor = self._shading_terms(
+            roof_azimuth, sun_elevation, sun_azimuth)
         
+        return {
+            'shading_factor': float(shading_factor),
+            'roof_azimuth': roof_azimuth,
+            'azimuth_alignment': float(azimuth_diff),
+            'elevation_factor': float(elevation_factor)
+        }
+
+    def _roof_azimuth(self, polygon_coords: List[Tuple[float, float]]) -> float:
+        """Estimate roof orientation from the polygon's longest edge"""
+        pts = _as_polygon(polygon_coords)
+        d = np.roll(pts, -1, axis=0) - pts
+        
+        # Squared lengths are enough to pick the longest edge
+        sq = d[:, 0]**2 + d[:, 1]**2
+        i = int(sq.argmax())
+        if sq[i] == 0:
+            return 180  # Default south-facing
+        
+        return math.degrees(math.atan2(d[i, 0], d[i, 1])) % 360
+
+    def _shading_terms(self, roof_azimuth: float, sun_elevation, sun_azimuth) -> Tuple:
+        """
+        (shading_factor, azimuth_diff, elevation_factor) for a roof orientation;
+        sun_elevation and sun_azimuth may be arrays
+        """
         # Calculate shading factor based on sun position relative to roof
-        azimuth_diff = abs(sun_azimuth - roof_azimuth)
-        if azimuth_diff > 180:
-            azimuth_diff = 360 - azimuth_diff
+        azimuth_diff = np.abs(np.asarray(sun_azimuth) - roof_azimuth)
+        azimuth_diff = np.where(azimuth_diff > 180, 360 - azimuth_diff, azimuth_diff)
         
         # Reduce shading when sun is aligned with roof orientation
         orientation_factor = 1 - 0.1 * (azimuth_diff / 90)
         
         # Elevation factor (more shading at low sun angles)
-        elevation_factor = min(1.0, sun_elevation / 30)
+        elevation_factor = np.minimum(1.0, np.asarray(sun_elevation) / 30)
         
         shading_factor = (self.rooftop_params['shading_factor'] * 
                          orientation_factor * elevation_factor)
         
-        return {
-            'shading_factor': max(0.7, shading_factor),  # Minimum 70% (30% max shading)
-            'roof_azimuth': roof_azimuth,
-            'azimuth_alignment': azimuth_diff,
-            'elevation_factor': elevation_factor
-        }
+        # Minimum 70% (30% max shading)
+        return np.maximum(0.7, shading_factor), azimuth_diff, elevation_factor
 
     def satellite_data_integration(self, polygon_coords: List[Tuple[float, float]]) -> Optional[Dict]:
         """
         Integrate satellite data from Google Earth Engine with enhanced small polygon handling
+        
+        Successful results are memoized per (polygon, day) in a bounded LRU, so
+        repeated irradiance or orientation calls for the same rooftop query GEE
+        once; misses are not cached and are retried on the next call.
         """
         if not self.use_satellite_data:
             return None
         
+        coords = _as_polygon(polygon_coords).tolist()
+        key = self._satellite_key(coords)
+        data = self._satellite_cache_get(key)
+        if data is None:
+            data = self._fetch_satellite_data(coords)
+            self._satellite_cache_put(key, data)
+        return data
+    
+    @staticmethod
+    def _satellite_key(coords: List[List[float]]) -> Tuple:
+        """Cache key of a polygon's satellite record; the GEE date window moves daily"""
+        return tuple(map(tuple, coords)), datetime.now().date()
+    
+    def _satellite_cache_get(self, key: Tuple) -> Optional[Dict]:
+        """Cached satellite record for key, marking it most recently used"""
+        with self._satellite_cache_lock:
+            data = self._satellite_cache.get(key)
+            if data is not None:
+                self._satellite_cache.move_to_end(key)
+            return data
+    
+    def _satellite_cache_put(self, key: Tuple, data: Optional[Dict]):
+        """Memoize a successful satellite record, evicting the least recently used"""
+        if data is None:
+            return
+        with self._satellite_cache_lock:
+            self._satellite_cache[key] = data
+            self._satellite_cache.move_to_end(key)
+            if len(self._satellite_cache) > self.SATELLITE_CACHE_SIZE:
+                self._satellite_cache.popitem(last=False)
+
+    def _fetch_satellite_data(self, polygon_coords: List[Tuple[float, float]]) -> Optional[Dict]:
+        """Query GEE for a polygon's satellite irradiance (uncached)"""
         try:
             # First try enhanced small polygon handler for better reliability
             enhanced_data = self.enhanced_gee_handler.get_enhanced_era5_data(polygon_coords)
@@ -354,70 +629,116 @@ class EnhancedRooftopCalculator:
                 }
             else:
                 # Fallback to original method
-                print("🔄 Enhanced handler failed, trying original GEE retriever...")
+                logger.info("🔄 Enhanced handler failed, trying original GEE retriever...")
                 satellite_data = self.gee_retriever.get_solar_irradiance_data(polygon_coords)
                 
                 if satellite_data and satellite_data['ghi_kwh_per_m2_day'] > 0:
-                    # Convert daily kWh/m² to instantaneous W/m² (rough approximation)
-                    ghi_watts = satellite_data['ghi_kwh_per_m2_day'] * 1000 / 8  # Assume 8 peak hours
-                    
-                    return {
-                        'ghi': ghi_watts,
-                        'dni': ghi_watts * 0.8,  # Estimate DNI from GHI
-                        'dhi': ghi_watts * 0.2,  # Estimate DHI from GHI
-                        'data_source': 'ERA5_Original',
-                        'daily_total': satellite_data['ghi_kwh_per_m2_day'],
-                        'cloud_factor': satellite_data.get('cloud_impact_factor', 1.0),
-                        'quality': 'High' if satellite_data['ghi_kwh_per_m2_day'] > 3 else 'Medium',
-                        'scientific_validity': 'Standard'
-                    }
+                    return self.satellite_data_from_daily_ghi(
+                        satellite_data['ghi_kwh_per_m2_day'], 'ERA5_Original',
+                        satellite_data.get('cloud_impact_factor', 1.0)
+                    )
             
         except Exception as e:
-            print(f"⚠️ Satellite data retrieval failed: {str(e)}")
+            logger.warning("⚠️ Satellite data retrieval failed: %s", e)
         
         return None
 
-    def calculate_enhanced_irradiance(self, lat: float, lon: float, 
-                                    polygon_coords: List[Tuple[float, float]],
-                                    date: datetime = None,
-                                    surface_tilt: float = None,
-                                    surface_azimuth: float = None) -> Dict:
+    def satellite_data_integration_batch(self, polygons: List[List[Tuple[float, float]]]) -> List[Optional[Dict]]:
         """
-        Calculate enhanced solar irradiance with all advanced features
-        """
-        if date is None:
-            date = datetime.now()
+        satellite_data_integration for many polygons, aligned with the input
         
-        if surface_tilt is None:
-            surface_tilt = self.rooftop_params['default_tilt']
+        Rooftops are far smaller than an ERA5 cell, so uncached polygons are
+        sampled at their centroids in one bulk request per BATCH_MAX_POINTS;
+        polygons without a value there fall back to the per-polygon handler,
+        run concurrently. Successful results go into the same memo as the single call.
+        """
+        if not self.use_satellite_data:
+            return [None] * len(polygons)
+        
+        polygons = [_as_polygon(coords).tolist() for coords in polygons]
+        keys = [self._satellite_key(coords) for coords in polygons]
+        results = {}
+        pending = {}
+        for key, coords in zip(keys, polygons):
+            if key in results or key in pending:
+                continue
+            data = self._satellite_cache_get(key)
+            if data is not None:
+                results[key] = data
+            else:
+                pending[key] = coords
         
-        if surface_azimuth is None:
-            surface_azimuth = self.rooftop_params['default_azimuth']
+        pending_keys = list(pending)
+        for start in range(0, len(pending_keys), self.BATCH_MAX_POINTS):
+            batch = pending_keys[start:start + self.BATCH_MAX_POINTS]
+            centroids = [tuple(np.mean(pending[key], axis=0).tolist()) for key in batch]
+            try:
+                values = self.gee_retriever.get_solar_irradiance_points(centroids)
+            except Exception as e:
+                logger.warning("⚠️ Bulk satellite retrieval failed: %s", e)
+                values = None
+            for key, ghi_kwh_per_day in zip(batch, values or []):
+                if ghi_kwh_per_day and ghi_kwh_per_day > 0:
+                    results[key] = self.satellite_data_from_daily_ghi(ghi_kwh_per_day, 'ERA5_Batch')
+                    self._satellite_cache_put(key, results[key])
+                    del pending[key]
+        
+        if pending:
+            with ThreadPoolExecutor(max_workers=self.BATCH_FALLBACK_WORKERS) as pool:
+                for key, data in zip(pending, pool.map(self._fetch_satellite_data, pending.values())):
+                    results[key] = data
+                    self._satellite_cache_put(key, data)
+        
+        return [results[key] for key in keys]
+
+    @staticmethod
+    def satellite_data_from_daily_ghi(ghi_kwh_per_day: float, data_source: str,
+                                      cloud_factor: float = 1.0) -> Dict:
+        """Satellite record as returned by satellite_data_integration, from a daily ERA5 GHI"""
+        # Convert daily kWh/m² to instantaneous W/m² (rough approximation)
+        ghi_watts = ghi_kwh_per_day * 1000 / 8  # Assume 8 peak hours
         
+        return {
+            'ghi': ghi_watts,
+            'dni': ghi_watts * 0.8,  # Estimate DNI from GHI
+            'dhi': ghi_watts * 0.2,  # Estimate DHI from GHI
+            'data_source': data_source,
+            'daily_total': ghi_kwh_per_day,
+            'cloud_factor': cloud_factor,
+            'quality': 'High' if ghi_kwh_per_day > 3 else 'Medium',
+            'scientific_validity': 'Standard'
+        }
+    
+    def _horizontal_irradiance(self, lat: float, lon: float,
+                               polygon_coords: List[Tuple[float, float]],
+                               date: datetime,
+                               satellite_data: Optional[Dict] = None) -> Tuple:
+        """
+        Solar position and horizontal GHI/DNI/DHI, which don't depend on the
+        surface orientation. Returns (solar_pos, ghi, dni, dhi, data_source,
+        satellite_data).
+        """
         # 1. Calculate precise solar position
         solar_pos = self.solar_position_michalsky(lat, lon, date)
         
         # 2. Try to get satellite data first
-        satellite_data = self.satellite_data_integration(polygon_coords)
+        if satellite_data is None:
+            satellite_data = self.satellite_data_integration(polygon_coords)
         
         if satellite_data:
-            print(f"📡 Using satellite data: {satellite_data['ghi']:.1f} W/m²")
+            logger.debug("📡 Using satellite data: %.1f W/m²", satellite_data['ghi'])
             ghi = satellite_data['ghi']
             dni = satellite_data['dni']
             dhi = satellite_data['dhi']
             data_source = 'Satellite_Enhanced'
         else:
             # 3. Calculate clear sky irradiance using advanced models
-            print(f"🧮 Using enhanced clear sky model")
-            air_mass = self.air_mass_kasten_young(solar_pos['zenith'], 
-                                                 self.atmospheric_params['altitude'])
+            logger.debug("🧮 Using enhanced clear sky model")
+            air_mass = self.air_mass_kasten_young(solar_pos['zenith'], self._altitude)
             
             clear_sky = self.clear_sky_ineichen_perez(
-                solar_pos['zenith'], air_mass,
-                self.atmospheric_params['altitude'],
-                self.atmospheric_params['water_vapor'],
-                self.atmospheric_params['aerosol_optical_depth'],
-                self.atmospheric_params['ozone']
+                solar_pos['zenith'], air_mass, self._altitude,
+                linke_turbidity=self._linke_turbidity
             )
             
             ghi = clear_sky['ghi']
@@ -425,12 +746,120 @@ class EnhancedRooftopCalculator:
             dhi = clear_sky['dhi']
             data_source = 'Enhanced_Clear_Sky'
         
+        return solar_pos, ghi, dni, dhi, data_source, satellite_data
+    
+    def _solar_day_profile(self, lat: float, lon: float, dates: List[datetime],
+                           satellite_data: Optional[Dict] = None,
+                           step_hours: float = 0.25) -> Dict:
+        """
+        Sun position and horizontal irradiance every step_hours across the solar
+        day (solar noon +-12 h) of each date, as (days, steps) arrays.
+        
+        Irradiance follows the clear-sky model; with satellite_data each day is
+        rescaled so its GHI integrates to the satellite daily total.
+        """
+        days = np.array([np.datetime64(d.date(), 'D') for d in dates])
+        offsets = np.arange(-12, 12, step_hours) + 12 - lon / 15  # hours after 00:00 UTC
+        times = days[:, None] + np.round(offsets * 3600).astype(np.int64).astype('timedelta64[s]')
+        
+        solar_pos = self.solar_position_michalsky_vec(lat, lon, times)
+        clear_sky = self.clear_sky_poa_batch(solar_pos['zenith'].ravel(), solar_pos['azimuth'].ravel(), 0, 180)
+        ghi, dni, dhi = (clear_sky[k].reshape(times.shape) for k in ('ghi', 'dni', 'dhi'))
+        
+        if satellite_data and satellite_data.get('daily_total'):
+            clear_daily = ghi.sum(axis=1, keepdims=True) * step_hours / 1000
+            scale = np.divide(satellite_data['daily_total'], clear_daily,
+                              out=np.zeros_like(clear_daily), where=clear_daily > 0)
+            ghi, dni, dhi = ghi * scale, dni * scale, dhi * scale
+        
+        return {
+            'zenith': solar_pos['zenith'],
+            'azimuth': solar_pos['azimuth'],
+            'elevation': solar_pos['elevation'],
+            'ghi': ghi,
+            'dni': dni,
+            'dhi': dhi
+        }
+
+    def integrate_daily_energy(self, lat: float, lon: float,
+                               polygon_coords: List[Tuple[float, float]],
+                               dates: List[datetime],
+                               surface_tilt, surface_azimuth,
+                               satellite_data: Optional[Dict] = None,
+                               step_hours: float = 0.25) -> np.ndarray:
+        """
+        Daily rooftop energy (kWh/m²) integrated over the solar day of each date
+        
+        surface_tilt and surface_azimuth may be arrays; the result has their
+        broadcast shape followed by one entry per date.
+        """
+        profile = self._solar_day_profile(lat, lon, dates, satellite_data, step_hours)
+        return self._daily_energy_from_profile(profile, polygon_coords, surface_tilt,
+                                               surface_azimuth, step_hours)
+
+    def _daily_energy_from_profile(self, profile: Dict, polygon_coords,
+                                   surface_tilt, surface_azimuth,
+                                   step_hours: float) -> np.ndarray:
+        """integrate_daily_energy for an already computed _solar_day_profile"""
+        polygon_coords = _as_polygon(polygon_coords)
+        poa_global = self.plane_of_array_global_grid(
+            profile['ghi'], profile['dni'], profile['dhi'],
+            profile['zenith'], profile['azimuth'],
+            np.asarray(surface_tilt, dtype=np.float64)[..., None, None],
+            np.asarray(surface_azimuth, dtype=np.float64)[..., None, None],
+            self._albedo, dtype=np.float32
+        )
+        
+        if len(polygon_coords) < 3:
+            shading_factor = self.rooftop_params['shading_factor']
+        else:
+            shading_factor = self._shading_terms(self._roof_azimuth(polygon_coords),
+                                                 profile['elevation'], profile['azimuth'])[0].astype(np.float32)
+        
+        # Fold the loss factors into one (days, steps) multiplier and apply it in place
+        loss_factor = shading_factor * np.float32(self.rooftop_params['soiling_factor'] *
+                                                  self.rooftop_params['spectral_factor'])
+        final_poa = np.multiply(poa_global, loss_factor, out=poa_global)
+        
+        # Both ends of the window sit at solar midnight, so the trapezoid rule is a
+        # plain sum; accumulate the float32 samples in float64
+        return final_poa.sum(axis=-1, dtype=np.float64) * step_hours / 1000
+    
+    def calculate_enhanced_irradiance(self, lat: float, lon: float, 
+                                    polygon_coords: List[Tuple[float, float]],
+                                    date: datetime = None,
+                                    surface_tilt: float = None,
+                                    surface_azimuth: float = None,
+                                    satellite_data: Optional[Dict] = None) -> Dict:
+        """
+        Calculate enhanced solar irradiance with all advanced features
+        
+        satellite_data may be passed in when it was already fetched in bulk
+        (see satellite_data_from_daily_ghi); otherwise it is queried here.
+        """
+        if date is None:
+            date = datetime.now()
+        
+        if surface_tilt is None:
+            surface_tilt = self.rooftop_params['default_tilt']
+        
+        if surface_azimuth is None:
+            surface_azimuth = self.rooftop_params['default_azimuth']
+        
+        # Convert once; downstream steps share the (N, 2) array
+        polygon_coords = _as_polygon(polygon_coords)
+        
+        # 1-3. Solar position and horizontal irradiance (satellite or clear sky)
+        solar_pos, ghi, dni, dhi, data_source, satellite_data = self._horizontal_irradiance(
+            lat, lon, polygon_coords, date, satellite_data
+        )
+        
         # 4. Calculate plane-of-array irradiance for tilted rooftop
         poa = self.plane_of_array_irradiance(
             ghi, dni, dhi,
             solar_pos['zenith'], solar_pos['azimuth'],
             surface_tilt, surface_azimuth,
-            self.atmospheric_params['albedo']
+            self._albedo
         )
         
         # 5. Apply shading analysis
@@ -438,14 +867,14 @@ class EnhancedRooftopCalculator:
                                       solar_pos['azimuth'])
         
         # 6. Apply rooftop-specific factors
-        final_poa = (poa['poa_global'] * 
-                    shading['shading_factor'] * 
-                    self.rooftop_params['soiling_factor'] * 
-                    self.rooftop_params['spectral_factor'])
+        final_poa = poa['poa_global'] * (shading['shading_factor'] *
+                                         self.rooftop_params['soiling_factor'] *
+                                         self.rooftop_params['spectral_factor'])
         
-        # 7. Calculate daily energy potential
-        # Simplified integration over day (assume 8 hours of useful sunlight)
-        daily_energy_kwh_per_m2 = final_poa * 8 / 1000  # Convert W to kWh
+        # 7. Calculate daily energy potential by integrating over the solar day
+        daily_energy_kwh_per_m2 = float(self.integrate_daily_energy(
+            lat, lon, polygon_coords, [date], surface_tilt, surface_azimuth, satellite_data
+        )[0])
         
         return {
             'solar_position': solar_pos,
@@ -481,42 +910,89 @@ class EnhancedRooftopCalculator:
         best_tilt = 0
         best_azimuth = 180
         
-        # Test different orientations
-        tilt_range = range(0, 61, 5)  # 0° to 60° in 5° steps
-        azimuth_range = range(90, 271, 15)  # 90° to 270° in 15° steps (E to W)
-        
-        results = []
+        # Daily energy on the 15th of each month, weighted by month length; sun
+        # position, irradiance and satellite data don't depend on the orientation
+        polygon_coords = _as_polygon(polygon_coords)
+        satellite_data = self.satellite_data_integration(polygon_coords)
+        days = [datetime(2024, month, 15) for month in range(1, 13)]
+        days_in_month = np.array([31, 29, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31])
+        step_hours = 0.25
+        profile = self._solar_day_profile(lat, lon, days, satellite_data, step_hours)
+        
+        # Two-stage search over tilt 0-60° and azimuth 90-270° (E to W). The
+        # energy surface is smooth and single-peaked, so the optimum lies within
+        # one coarse step of the coarse maximum: a 10°/30° grid (7x7) is refined
+        # by a 9x9 grid spanning +-one coarse step, and the refined maximum is
+        # polished by a parabolic fit through its neighbours (one evaluation).
+        tilt_range, azimuth_range = (0, 60), (90, 270)
+        # Annual energy per (tilt, azimuth); the stages' grids overlap, so
+        # orientations evaluated twice are recorded once
+        results = {}
+        
+        def evaluate(tilts, azimuths):
+            """Annual energy over a tilt x azimuth grid, recorded in results"""
+            daily_energy = self._daily_energy_from_profile(
+                profile, polygon_coords, tilts[:, None], azimuths[None, :], step_hours
+            )
+            annual_energy = daily_energy @ days_in_month
+            results.update(
+                ((tilt, azimuth), energy)
+                for tilt, row in zip(tilts.tolist(), annual_energy.tolist())
+                for azimuth, energy in zip(azimuths.tolist(), row)
+            )
+            return annual_energy
         
-        for tilt in tilt_range:
-            for azimuth in azimuth_range:
-                # Calculate annual energy (simplified - use summer solstice)
-                summer_date = datetime(2024, 6, 21, 12, 0, 0)
-                irradiance = self.calculate_enhanced_irradiance(
-                    lat, lon, polygon_coords, summer_date, tilt, azimuth
-                )
-                
-                annual_energy = irradiance['daily_energy_kwh_per_m2'] * 365
-                
-                results.append({
-                    'tilt': tilt,
-                    'azimuth': azimuth,
-                    'annual_energy_kwh_per_m2': annual_energy
-                })
-                
-                if annual_energy > best_energy:
-                    best_energy = annual_energy
-                    best_tilt = tilt
-                    best_azimuth = azimuth
+        tilt_step, azimuth_step = 10.0, 30.0
+        tilts = np.arange(0, 61, tilt_step)
+        azimuths = np.arange(90, 271, azimuth_step)
+        for stage in range(2):
+            annual_energy = evaluate(tilts, azimuths)
+            
+            # First maximum in tilt-major order
+            best = np.unravel_index(np.argmax(annual_energy), annual_energy.shape)
+            if annual_energy[best] > best_energy:
+                best_energy = float(annual_energy[best])
+                best_tilt = float(tilts[best[0]])
+                best_azimuth = float(azimuths[best[1]])
+            
+            if stage == 0:
+                offsets = np.arange(-4, 5) / 4
+                tilts = np.unique(np.clip(best_tilt + tilt_step * offsets, *tilt_range))
+                azimuths = np.unique(np.clip(best_azimuth + azimuth_step * offsets, *azimuth_range))
+        
+        # Parabola vertex along each axis through the refined maximum and its
+        # neighbours (axes where the maximum sits on the range edge are kept)
+        i, j = best
+        vertex_tilt, vertex_azimuth = best_tilt, best_azimuth
+        if 0 < i < len(tilts) - 1:
+            vertex_tilt += self._parabola_vertex_offset(*annual_energy[i - 1:i + 2, j], tilt_step / 4)
+        if 0 < j < len(azimuths) - 1:
+            vertex_azimuth += self._parabola_vertex_offset(*annual_energy[i, j - 1:j + 2], azimuth_step / 4)
+        if (vertex_tilt, vertex_azimuth) != (best_tilt, best_azimuth):
+            vertex_energy = float(evaluate(np.array([vertex_tilt]), np.array([vertex_azimuth]))[0, 0])
+            if vertex_energy > best_energy:
+                best_energy, best_tilt, best_azimuth = vertex_energy, vertex_tilt, vertex_azimuth
         
         return {
-            'optimal_tilt': best_tilt,
-            'optimal_azimuth': best_azimuth,
+            'optimal_tilt': round(best_tilt, 1),
+            'optimal_azimuth': round(best_azimuth, 1),
             'max_annual_energy_kwh_per_m2': best_energy,
             'improvement_over_default': (best_energy / 
                                        (self.rooftop_params['default_tilt'] * 365) - 1) * 100,
-            'all_results': results
+            'all_results': [
+                {'tilt': tilt, 'azimuth': azimuth, 'annual_energy_kwh_per_m2': energy}
+                for (tilt, azimuth), energy in results.items()
+            ]
         }
 
+    @staticmethod
+    def _parabola_vertex_offset(f_minus: float, f_0: float, f_plus: float, step: float) -> float:
+        """Offset of the vertex of the parabola through three equally spaced samples, within +-step"""
+        curvature = f_minus - 2 * f_0 + f_plus
+        if curvature >= 0:
+            return 0.0
+        return float(np.clip(0.5 * step * (f_minus - f_plus) / curvature, -step, step))
+
 def test_enhanced_calculator():
     """Test the enhanced rooftop calculator"""
     print("🚀 Testing Enhanced Rooftop Calculator...")
@@ -1,55 +1,241 @@
 import ee
+import asyncio
 import json
+import hashlib
 import numpy as np
-from datetime import datetime, timedelta
-from typing import Dict, List, Tuple, Optional
+from datetime import date, datetime, timedelta
+from collections import OrderedDict
+from typing import Callable, Dict, List, Tuple, Optional
 from google.oauth2 import service_account
 import os
+import logging
+import threading
+from functools import lru_cache, partial
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dotenv import load_dotenv
 
+try:
+    import diskcache
+    DISKCACHE_AVAILABLE = True
+except ImportError:
+    DISKCACHE_AVAILABLE = False
+
+# Load environment variables once per process
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# High-volume Earth Engine endpoint, meant for programmatic batch requests.
+# Set GEE_ENDPOINT to override (e.g. https://earthengine.googleapis.com).
+GEE_HIGH_VOLUME_URL = 'https://earthengine-highvolume.googleapis.com'
+
+# Persistent cache of reduced ERA5 values, shared across sessions
+DEFAULT_GEE_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'solsat', 'gee')
+
+# ERA5-Land daily aggregates trail real time by about a week; reductions
+# ending before this many days ago are final and persisted
+ERA5_LATENCY_DAYS = 7
+
+# Reductions reaching into the latency window are still being filled in;
+# they are kept on disk only this long (seconds)
+PROVISIONAL_CACHE_EXPIRE = 6 * 3600
+
+# ERA5 unit conversions (multiplied in, never divided)
+J_TO_KWH = 1.0 / 3_600_000.0  # J/m² to kWh/m²
+M_TO_MM = 1000.0              # m to mm
+KELVIN_OFFSET = 273.15        # K to °C
+
+# Regional assumptions applied to ERA5 values (tuned for Thailand)
+REGIONAL_DEFAULTS = {
+    'clear_sky_factor': 1.2,             # Clear-sky GHI relative to actual GHI
+    'diffuse_fraction': 0.3,             # Typical diffuse share of GHI
+    'default_temperature_celsius': 25.0  # Used when ERA5 has no temperature
+}
+
+# Polygons with more vertices are simplified server-side (tolerance in metres);
+# detail that fine is irrelevant at ERA5's ~11km scale
+GEOMETRY_SIMPLIFY_VERTICES = 1000
+GEOMETRY_SIMPLIFY_MAX_ERROR = 10
+
+@lru_cache(maxsize=128)
+def _polygon_geometry(ring_bytes: bytes) -> ee.Geometry:
+    """ee.Geometry.Polygon for a float64 (lon, lat) ring buffer, built once per distinct polygon"""
+    ring = np.frombuffer(ring_bytes, dtype=np.float64).reshape(-1, 2)
+    geometry = ee.Geometry.Polygon([ring.tolist()])
+    if len(ring) > GEOMETRY_SIMPLIFY_VERTICES:
+        geometry = geometry.simplify(maxError=GEOMETRY_SIMPLIFY_MAX_ERROR)
+    return geometry
+
+@lru_cache(maxsize=16)
+def _days_before(today: date, days: int) -> str:
+    """'YYYY-MM-DD' of the day `days` before today (memoized, default ranges repeat all day)"""
+    return (today - timedelta(days=days)).strftime('%Y-%m-%d')
+
+def _default_date_range(start_date: Optional[str], end_date: Optional[str],
+                        start_days_ago: int, end_days_ago: int) -> Tuple[str, str]:
+    """Fill in missing range bounds relative to one datetime.now() snapshot"""
+    if start_date and end_date:
+        return start_date, end_date
+    today = datetime.now().date()
+    return (start_date or _days_before(today, start_days_ago),
+            end_date or _days_before(today, end_days_ago))
+
+# Service account info parsed from the environment, built on first use
+_service_account_info: Optional[Dict[str, str]] = None
+
+def _get_service_account_info() -> Dict[str, str]:
+    """Service account info from the GOOGLE_* environment variables (cached)"""
+    global _service_account_info
+    if _service_account_info is None:
+        _service_account_info = {
+            "type": os.getenv("GOOGLE_TYPE"),
+            "project_id": os.getenv("GOOGLE_PROJECT_ID"),
+            "private_key_id": os.getenv("GOOGLE_PRIVATE_KEY_ID"),
+            "private_key": os.getenv("GOOGLE_PRIVATE_KEY").replace('\\n', '\n'),
+            "client_email": os.getenv("GOOGLE_CLIENT_EMAIL"),
+            "client_id": os.getenv("GOOGLE_CLIENT_ID"),
+            "auth_uri": os.getenv("GOOGLE_AUTH_URI"),
+            "token_uri": os.getenv("GOOGLE_TOKEN_URI"),
+            "auth_provider_x509_cert_url": os.getenv("GOOGLE_AUTH_PROVIDER_CERT_URL"),
+            "client_x509_cert_url": os.getenv("GOOGLE_CLIENT_CERT_URL"),
+        }
+    return _service_account_info
+
+# ee.Initialize is process-wide; every retriever and handler shares one session
+_EE_INITIALIZED = False
+_EE_INIT_LOCK = threading.Lock()
+
+def initialize_earth_engine():
+    """
+    Authenticate with the service account and initialize Earth Engine once per
+    process, always against the high-volume endpoint (or GEE_ENDPOINT)
+    """
+    global _EE_INITIALIZED
+    with _EE_INIT_LOCK:
+        if _EE_INITIALIZED:
+            return
+        credentials = service_account.Credentials.from_service_account_info(
+            _get_service_account_info(),
+            scopes=["https://www.googleapis.com/auth/earthengine"]
+        )
+        ee.Initialize(credentials, opt_url=os.getenv("GEE_ENDPOINT", GEE_HIGH_VOLUME_URL))
+        _EE_INITIALIZED = True
+
 class GEESolarDataRetriever:
     """
     Google Earth Engine Solar Data Retrieval System
     Fetches real satellite data for solar irradiance analysis
     """
     
-    def __init__(self):
-        """Initialize GEE authentication and datasets"""
+    # ERA5 bands reduced by the solar and weather getters
+    SOLAR_BANDS = [
+        'surface_solar_radiation_downwards_sum',  # Solar radiation
+    ]
+    WEATHER_BANDS = [
+        'temperature_2m',           # 2m temperature
+        'total_precipitation_sum',  # Total precipitation
+        'surface_solar_radiation_downwards_sum',  # Solar radiation
+    ]
+    
+    # Tile parallelism of the temporal reductions; raise it if they run out of memory
+    REDUCE_PARALLEL_SCALE = 4
+    
+    # Reductions kept in the in-memory LRU cache
+    MEMORY_CACHE_SIZE = 1024
+    
+    # Runs blocking getInfo() calls for the async getters (threads start on first use)
+    _executor = ThreadPoolExecutor(max_workers=20, thread_name_prefix='gee-getinfo')
+    
+    def __init__(self, cache_dir: Optional[str] = DEFAULT_GEE_CACHE_DIR):
+        """
+        Initialize GEE authentication and datasets
+        
+        Args:
+            cache_dir: Directory of the persistent reduceRegion cache
+                (None disables it; also disabled when diskcache is not installed)
+        """
+        # Reduced band dictionaries keyed by polygon, date range and bands
+        self._memory_cache: 'OrderedDict[str, Dict]' = OrderedDict()
+        self._memory_cache_lock = threading.Lock()
+        self.cache_dir = cache_dir if DISKCACHE_AVAILABLE else None
+        self._disk_cache = None
+        
         self.authenticate_gee()
         self.initialize_datasets()
+    
+    @property
+    def disk_cache(self) -> Optional['diskcache.Cache']:
+        """Persistent reduceRegion cache, opened lazily (None when disabled)"""
+        if self._disk_cache is None and self.cache_dir:
+            self._disk_cache = diskcache.Cache(self.cache_dir)
+        return self._disk_cache
+    
+    def _cached_reduction(self, polygon_coords: List[Tuple[float, float]],
+                          start_date: str, end_date: str, bands: List[str],
+                          get_info: Callable[[], Dict]) -> Dict:
+        """
+        get_info() memoized in memory and on disk by polygon, date range and bands
+        """
+        key = self._reduction_key(polygon_coords, start_date, end_date, bands)
+        result = self._cached_lookup(key)
+        if result is None:
+            result = get_info()
+            self._cache_store(key, result, end_date)
+        return result
+    
+    @staticmethod
+    def _reduction_key(polygon_coords: List[Tuple[float, float]],
+                       start_date: str, end_date: str, bands: List[str]) -> str:
+        """Cache key of a reduceRegion over the given polygon, date range and bands"""
+        return hashlib.blake2b(json.dumps({
+            'coords': [[float(lon), float(lat)] for lon, lat in polygon_coords],
+            'start': start_date,
+            'end': end_date,
+            'bands': list(bands)
+        }, sort_keys=True).encode(), digest_size=20).hexdigest()
+    
+    def _cached_lookup(self, key: str) -> Optional[Dict]:
+        """Cached reduction for key from memory or disk, without fetching"""
+        with self._memory_cache_lock:
+            result = self._memory_cache.get(key)
+            if result is not None:
+                self._memory_cache.move_to_end(key)
+                return result
+        if self.disk_cache is not None:
+            result = self.disk_cache.get(key)
+            if result is not None:
+                self._memory_put(key, result)
+        return result
+    
+    def _memory_put(self, key: str, result: Dict):
+        """Insert into the in-memory LRU cache, evicting the oldest entry when full"""
+        with self._memory_cache_lock:
+            self._memory_cache[key] = result
+            self._memory_cache.move_to_end(key)
+            if len(self._memory_cache) > self.MEMORY_CACHE_SIZE:
+                self._memory_cache.popitem(last=False)
+    
+    def _cache_store(self, key: str, result: Dict, end_date: str):
+        """
+        Store a reduction in memory and on disk; ranges ending inside the ERA5
+        latency window are provisional and expire from disk
+        """
+        self._memory_put(key, result)
+        if self.disk_cache is not None:
+            if end_date <= _days_before(datetime.now().date(), ERA5_LATENCY_DAYS):
+                self.disk_cache.set(key, result)
+            else:
+                self.disk_cache.set(key, result, expire=PROVISIONAL_CACHE_EXPIRE)
         
     def authenticate_gee(self):
         """Authenticate with Google Earth Engine using service account"""
         try:
-            # Load environment variables
-            load_dotenv()
-            
-            # Build service account info from environment variables
-            service_account_info = {
-                "type": os.getenv("GOOGLE_TYPE"),
-                "project_id": os.getenv("GOOGLE_PROJECT_ID"),
-                "private_key_id": os.getenv("GOOGLE_PRIVATE_KEY_ID"),
-                "private_key": os.getenv("GOOGLE_PRIVATE_KEY").replace('\\n', '\n'),
-                "client_email": os.getenv("GOOGLE_CLIENT_EMAIL"),
-                "client_id": os.getenv("GOOGLE_CLIENT_ID"),
-                "auth_uri": os.getenv("GOOGLE_AUTH_URI"),
-                "token_uri": os.getenv("GOOGLE_TOKEN_URI"),
-                "auth_provider_x509_cert_url": os.getenv("GOOGLE_AUTH_PROVIDER_CERT_URL"),
-                "client_x509_cert_url": os.getenv("GOOGLE_CLIENT_CERT_URL"),
-            }
-            
-            # Create credentials
-            credentials = service_account.Credentials.from_service_account_info(
-                service_account_info,
-                scopes=["https://www.googleapis.com/auth/earthengine"]
-            )
-            
-            # Initialize Earth Engine
-            ee.Initialize(credentials)
-            print("✅ Google Earth Engine authentication successful!")
+            # Shared with the small polygon handler; a no-op once initialized
+            initialize_earth_engine()
+            logger.info("✅ Google Earth Engine authentication successful!")
             
         except Exception as e:
-            print(f"❌ GEE Authentication failed: {str(e)}")
+            logger.error("❌ GEE Authentication failed: %s", e)
             raise
     
     def initialize_datasets(self):
@@ -64,17 +250,33 @@ class GEESolarDataRetriever:
             # Landsat 8 for surface reflectance (optional)
             self.landsat8 = ee.ImageCollection("LANDSAT/LC08/C02/T1_L2")
             
-            print("✅ Earth Engine datasets initialized successfully!")
+            logger.info("✅ Earth Engine datasets initialized successfully!")
             
         except Exception as e:
-            print(f"❌ Dataset initialization failed: {str(e)}")
+            logger.error("❌ Dataset initialization failed: %s", e)
             raise
     
+    def _temporal_mean(self, collection: ee.ImageCollection, bands: List[str],
+                       with_std: bool = False) -> ee.Image:
+        """
+        Per-pixel mean of the given bands over an ImageCollection, keeping band names
+        
+        with_std adds a '<band>_stdDev' band for each band, computed in the same
+        pass (combined reducer with shared inputs).
+        """
+        reducer = ee.Reducer.mean()
+        if with_std:
+            reducer = reducer.combine(ee.Reducer.stdDev(), sharedInputs=True)
+        reduced = collection.select(bands).reduce(reducer, parallelScale=self.REDUCE_PARALLEL_SCALE)
+        # reduce() suffixes every output band with the reducer name
+        return reduced.regexpRename('_mean$', '')
+    
     def create_polygon_geometry(self, polygon_coords: List[Tuple[float, float]]) -> ee.Geometry:
         """Convert polygon coordinates to Earth Engine geometry"""
-        # Convert to GEE format: [[lon, lat], [lon, lat], ...]
-        gee_coords = [[coord[0], coord[1]] for coord in polygon_coords]
-        return ee.Geometry.Polygon([gee_coords])
+        # Convert to GEE format [[lon, lat], ...] in one vectorized copy; the raw
+        # buffer is the cache key, so the geometry is reused across getters
+        ring = np.ascontiguousarray(np.asarray(polygon_coords, dtype=np.float64)[:, :2])
+        return _polygon_geometry(ring.tobytes())
     
     def get_solar_irradiance_data(self, polygon_coords: List[Tuple[float, float]], 
                                  start_date: str = None, end_date: str = None) -> Dict:
@@ -88,10 +290,7 @@ class GEESolarDataRetriever:
         """
         try:
             # Set default date range (last 6 months for better data availability)
-            if not start_date:
-                start_date = (datetime.now() - timedelta(days=180)).strftime('%Y-%m-%d')
-            if not end_date:
-                end_date = (datetime.now() - timedelta(days=30)).strftime('%Y-%m-%d')
+            start_date, end_date = _default_date_range(start_date, end_date, 180, 30)
             
             # Create geometry
             geometry = self.create_polygon_geometry(polygon_coords)
@@ -101,43 +300,156 @@ class GEESolarDataRetriever:
                          .filterDate(start_date, end_date)
                          .filterBounds(geometry))
             
-            # Select solar radiation band
-            solar_bands = solar_data.select([
-                'surface_solar_radiation_downwards_sum',  # Solar radiation
-            ])
+            # A combined solar + weather reduction over the same range already has the band
+            combined = self._cached_lookup(self._reduction_key(
+                polygon_coords, start_date, end_date, self.WEATHER_BANDS))
+            if combined is not None:
+                return self._solar_irradiance_record(
+                    {band: combined[band] for band in self.SOLAR_BANDS if band in combined},
+                    start_date, end_date
+                )
+            
+            # Mean solar radiation image over the date range
+            solar_mean = self._temporal_mean(solar_data, self.SOLAR_BANDS)
             
             # Calculate statistics over the region
-            stats = solar_bands.mean().reduceRegion(
+            stats = solar_mean.reduceRegion(
                 reducer=ee.Reducer.mean(),
                 geometry=geometry,
                 scale=11132,  # ~10km resolution
                 maxPixels=1e9
             )
             
-            # Get the computed values
-            result = stats.getInfo()
+            # Get the computed values (cached per polygon and date range)
+            result = self._cached_reduction(polygon_coords, start_date, end_date,
+                                            self.SOLAR_BANDS, stats.getInfo)
+            
+            return self._solar_irradiance_record(result, start_date, end_date)
+            
+        except Exception as e:
+            logger.error("❌ Error fetching solar irradiance data: %s", e)
+            return None
+    
+    async def get_solar_irradiance_data_async(self, polygon_coords: List[Tuple[float, float]],
+                                              start_date: str = None, end_date: str = None) -> Dict:
+        """get_solar_irradiance_data without blocking the event loop (for async handlers)"""
+        return await self._run_blocking(self.get_solar_irradiance_data, polygon_coords,
+                                        start_date, end_date)
+    
+    async def _run_blocking(self, func: Callable, *args):
+        """Await func(*args) on the shared getInfo executor"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(func, *args))
+    
+    def _solar_irradiance_record(self, result: Dict, start_date: str, end_date: str) -> Dict:
+        """get_solar_irradiance_data's result dict from a reduced ERA5 band dictionary"""
+        # Convert from J/m² to kWh/m²/day
+        solar_radiation_j = result.get('surface_solar_radiation_downwards_sum', 0)
+        ghi_kwh_per_day = solar_radiation_j * J_TO_KWH if solar_radiation_j else 0  # J to kWh conversion
+        
+        # Estimate clear sky (assume 20% higher than actual for Thailand)
+        clear_sky_ghi = ghi_kwh_per_day * REGIONAL_DEFAULTS['clear_sky_factor']
+        
+        return {
+            'ghi_kwh_per_m2_day': ghi_kwh_per_day,
+            'clear_sky_ghi_kwh_per_m2_day': clear_sky_ghi,
+            'diffuse_fraction': REGIONAL_DEFAULTS['diffuse_fraction'],  # Typical value for Thailand
+            'cloud_impact_factor': ghi_kwh_per_day / max(clear_sky_ghi, 0.1),
+            'data_source': 'ERA5',
+            'date_range': f"{start_date} to {end_date}",
+            'raw_data': result
+        }
+    
+    def get_solar_irradiance_points(self, points: List[Tuple[float, float]],
+                                    start_date: str = None, end_date: str = None) -> Optional[List[Optional[float]]]:
+        """
+        Fetch mean ERA5 GHI (kWh/m²/day) at many points in a single request
+        
+        Args:
+            points: List of (longitude, latitude) tuples
+            start_date: Start date in 'YYYY-MM-DD' format
+            end_date: End date in 'YYYY-MM-DD' format
+        
+        Returns one value per point in input order (None where ERA5 has no data).
+        """
+        try:
+            # Same default date range as get_solar_irradiance_data
+            start_date, end_date = _default_date_range(start_date, end_date, 180, 30)
+            
+            radiation = self._reduce_solar_regions(
+                [ee.Geometry.Point([lon, lat]) for lon, lat in points], start_date, end_date
+            )
             
             # Convert from J/m² to kWh/m²/day
-            solar_radiation_j = result.get('surface_solar_radiation_downwards_sum', 0)
-            ghi_kwh_per_day = solar_radiation_j / 3600000 if solar_radiation_j else 0  # J to kWh conversion
+            return [solar_radiation_j * J_TO_KWH if solar_radiation_j else None
+                    for solar_radiation_j in radiation]
             
-            # Estimate clear sky (assume 20% higher than actual for Thailand)
-            clear_sky_ghi = ghi_kwh_per_day * 1.2
+        except Exception as e:
+            logger.error("❌ Error fetching bulk solar irradiance data: %s", e)
+            return None
+    
+    def get_solar_irradiance_batch(self, polygons: List[List[Tuple[float, float]]],
+                                   start_date: str = None, end_date: str = None) -> Optional[List[Dict]]:
+        """
+        Fetch get_solar_irradiance_data results for many polygons in a single request
+        
+        Args:
+            polygons: List of polygons, each a list of (longitude, latitude) tuples
+            start_date: Start date in 'YYYY-MM-DD' format
+            end_date: End date in 'YYYY-MM-DD' format
+        
+        Returns one record per polygon in input order. Results share
+        get_solar_irradiance_data's cache, and only uncached polygons are requested.
+        """
+        try:
+            # Same default date range as get_solar_irradiance_data
+            start_date, end_date = _default_date_range(start_date, end_date, 180, 30)
             
-            return {
-                'ghi_kwh_per_m2_day': ghi_kwh_per_day,
-                'clear_sky_ghi_kwh_per_m2_day': clear_sky_ghi,
-                'diffuse_fraction': 0.3,  # Typical value for Thailand
-                'cloud_impact_factor': ghi_kwh_per_day / max(clear_sky_ghi, 0.1),
-                'data_source': 'ERA5',
-                'date_range': f"{start_date} to {end_date}",
-                'raw_data': result
-            }
+            keys = [self._reduction_key(polygon, start_date, end_date, self.SOLAR_BANDS)
+                    for polygon in polygons]
+            results = [self._cached_lookup(key) for key in keys]
+            missing = [i for i, result in enumerate(results) if result is None]
+            
+            if missing:
+                radiation = self._reduce_solar_regions(
+                    [self.create_polygon_geometry(polygons[i]) for i in missing], start_date, end_date
+                )
+                for i, solar_radiation_j in zip(missing, radiation):
+                    results[i] = {'surface_solar_radiation_downwards_sum': solar_radiation_j}
+                    self._cache_store(keys[i], results[i], end_date)
+            
+            return [self._solar_irradiance_record(result, start_date, end_date) for result in results]
             
         except Exception as e:
-            print(f"❌ Error fetching solar irradiance data: {str(e)}")
+            logger.error("❌ Error fetching batch solar irradiance data: %s", e)
             return None
     
+    def _reduce_solar_regions(self, geometries: List[ee.Geometry],
+                              start_date: str, end_date: str) -> List[Optional[float]]:
+        """Mean ERA5 solar radiation (J/m²) over each geometry, in one reduceRegions request"""
+        # One feature per geometry, tagged with its index so results can be realigned
+        collection = ee.FeatureCollection([
+            ee.Feature(geometry, {'idx': i}) for i, geometry in enumerate(geometries)
+        ])
+        
+        # ERA5 images are global, so no filterBounds is needed
+        mean_image = self._temporal_mean(self.era5_daily.filterDate(start_date, end_date),
+                                         self.SOLAR_BANDS)
+        
+        # Reduce every region in one server-side pass and fetch them together
+        sampled = mean_image.reduceRegions(
+            collection=collection,
+            reducer=ee.Reducer.mean(),
+            scale=11132  # ~10km resolution
+        )
+        result = sampled.getInfo()
+        
+        values = [None] * len(geometries)
+        for feature in result.get('features', []):
+            properties = feature.get('properties', {})
+            values[properties['idx']] = properties.get('mean')
+        return values
+    
     def get_weather_data(self, polygon_coords: List[Tuple[float, float]], 
                         start_date: str = None, end_date: str = None) -> Dict:
         """
@@ -145,10 +457,7 @@ class GEESolarDataRetriever:
         """
         try:
             # Set default date range
-            if not start_date:
-                start_date = (datetime.now() - timedelta(days=365)).strftime('%Y-%m-%d')
-            if not end_date:
-                end_date = datetime.now().strftime('%Y-%m-%d')
+            start_date, end_date = _default_date_range(start_date, end_date, 365, 0)
             
             # Create geometry
             geometry = self.create_polygon_geometry(polygon_coords)
@@ -158,45 +467,97 @@ class GEESolarDataRetriever:
                            .filterDate(start_date, end_date)
                            .filterBounds(geometry))
             
-            print('weather_data', weather_data)
-            # Select relevant weather bands
-            weather_bands = weather_data.select([
-                'temperature_2m',           # 2m temperature
-                'total_precipitation_sum',  # Total precipitation
-                'surface_solar_radiation_downwards_sum',  # Solar radiation
-            ])
+            # Mean and day-to-day standard deviation of the weather bands
+            weather_stats = self._temporal_mean(weather_data, self.WEATHER_BANDS, with_std=True)
             
             # Calculate statistics
-            stats = weather_bands.mean().reduceRegion(
+            stats = weather_stats.reduceRegion(
                 reducer=ee.Reducer.mean(),
                 geometry=geometry,
                 scale=11132,
                 maxPixels=1e9
             )
             
-            result = stats.getInfo()
+            result = self._cached_reduction(polygon_coords, start_date, end_date,
+                                            self.WEATHER_BANDS, stats.getInfo)
             
-            # Convert units with proper None handling
-            temp_kelvin = result.get('temperature_2m')
-            temp_celsius = (temp_kelvin - 273.15) if temp_kelvin is not None else 25.0  # Default to 25°C
+            return self._weather_record(result, start_date, end_date)
             
-            precipitation = result.get('total_precipitation_sum')
-            precipitation_mm = (precipitation * 1000) if precipitation is not None else 0.0  # m to mm
+        except Exception as e:
+            logger.error("❌ Error fetching weather data: %s", e)
+            return None
+    
+    async def get_weather_data_async(self, polygon_coords: List[Tuple[float, float]],
+                                     start_date: str = None, end_date: str = None) -> Dict:
+        """get_weather_data without blocking the event loop (for async handlers)"""
+        return await self._run_blocking(self.get_weather_data, polygon_coords,
+                                        start_date, end_date)
+    
+    def _weather_record(self, result: Dict, start_date: str, end_date: str) -> Dict:
+        """get_weather_data's result dict from a reduced ERA5 band dictionary"""
+        # Convert units with proper None handling
+        temp_kelvin = result.get('temperature_2m')
+        temp_celsius = ((temp_kelvin - KELVIN_OFFSET) if temp_kelvin is not None
+                        else REGIONAL_DEFAULTS['default_temperature_celsius'])
+        temp_std = result.get('temperature_2m_stdDev')  # Same in K and °C
+        
+        precipitation = result.get('total_precipitation_sum')
+        precipitation_mm = (precipitation * M_TO_MM) if precipitation is not None else 0.0  # m to mm
+        
+        solar_radiation = result.get('surface_solar_radiation_downwards_sum')
+        solar_radiation_kwh = (solar_radiation * J_TO_KWH) if solar_radiation is not None else 0.0  # J/m² to kWh/m²
+        
+        return {
+            'average_temperature_celsius': temp_celsius,
+            'temperature_stddev_celsius': temp_std,
+            'total_precipitation_mm': precipitation_mm,
+            'solar_radiation_kwh_per_m2': solar_radiation_kwh,
+            'data_source': 'ERA5',
+            'date_range': f"{start_date} to {end_date}",
+            'raw_data': result
+        }
+    
+    def get_combined_data(self, polygon_coords: List[Tuple[float, float]],
+                          start_date: str = None, end_date: str = None) -> Optional[Dict]:
+        """
+        Fetch solar irradiance and weather data with a single reduceRegion
+        
+        Returns {'solar': <get_solar_irradiance_data result>, 'weather':
+        <get_weather_data result>} for the same date range (defaults as for
+        get_solar_irradiance_data). The reduction is cached under the same key
+        get_weather_data uses, and get_solar_irradiance_data reads its band from
+        it, so either getter reuses it afterwards.
+        """
+        try:
+            start_date, end_date = _default_date_range(start_date, end_date, 180, 30)
             
-            solar_radiation = result.get('surface_solar_radiation_downwards_sum')
-            solar_radiation_kwh = (solar_radiation / 3600000) if solar_radiation is not None else 0.0  # J/m² to kWh/m²
+            geometry = self.create_polygon_geometry(polygon_coords)
+            
+            # One image holding every band (as get_weather_data builds it), reduced once
+            combined_stats = self._temporal_mean(
+                self.era5_daily.filterDate(start_date, end_date).filterBounds(geometry),
+                self.WEATHER_BANDS, with_std=True
+            )
+            stats = combined_stats.reduceRegion(
+                reducer=ee.Reducer.mean(),
+                geometry=geometry,
+                scale=11132,  # ~10km resolution
+                maxPixels=1e9
+            )
+            
+            result = self._cached_reduction(polygon_coords, start_date, end_date,
+                                            self.WEATHER_BANDS, stats.getInfo)
             
             return {
-                'average_temperature_celsius': temp_celsius,
-                'total_precipitation_mm': precipitation_mm,
-                'solar_radiation_kwh_per_m2': solar_radiation_kwh,
-                'data_source': 'ERA5',
-                'date_range': f"{start_date} to {end_date}",
-                'raw_data': result
+                'solar': self._solar_irradiance_record(
+                    {band: result[band] for band in self.SOLAR_BANDS if band in result},
+                    start_date, end_date
+                ),
+                'weather': self._weather_record(result, start_date, end_date)
             }
             
         except Exception as e:
-            print(f"❌ Error fetching weather data: {str(e)}")
+            logger.error("❌ Error fetching combined solar/weather data: %s", e)
             return None
     
     def get_monthly_solar_data(self, polygon_coords: List[Tuple[float, float]], 
@@ -207,37 +568,114 @@ class GEESolarDataRetriever:
         if not year:
             year = datetime.now().year - 1  # Previous year
         
-        monthly_data = {}
+        # Month records share get_solar_irradiance_data's cache, so finished
+        # months are read from disk instead of being requested again
+        month_ranges = {month: self._month_range(year, month) for month in range(1, 13)}
+        month_keys = {
+            month: self._reduction_key(polygon_coords, *month_range, self.SOLAR_BANDS)
+            for month, month_range in month_ranges.items()
+        }
+        records = {}
+        for month, key in month_keys.items():
+            record = self._cached_lookup(key)
+            if record is not None:
+                records[month] = record
+        missing = [month for month in month_ranges if month not in records]
         
-        for month in range(1, 13):
-            start_date = f"{year}-{month:02d}-01"
-            if month == 12:
-                end_date = f"{year + 1}-01-01"
-            else:
-                end_date = f"{year}-{month + 1:02d}-01"
+        try:
+            if missing:
+                records.update(self._fetch_monthly_records(polygon_coords, year, missing))
+                for month in missing:
+                    if month in records:
+                        self._cache_store(month_keys[month], records[month], month_ranges[month][1])
             
-            month_data = self.get_solar_irradiance_data(
-                polygon_coords, start_date, end_date
-            )
+            monthly_data = {
+                f"month_{month:02d}": self._solar_irradiance_record(records[month], *month_ranges[month])
+                for month in sorted(records)
+            }
             
-            if month_data:
-                monthly_data[f"month_{month:02d}"] = month_data
+        except Exception as e:
+            logger.warning("⚠️ Batched monthly request failed (%s), fetching months concurrently...", e)
+            monthly_data = self._get_monthly_solar_data_concurrent(polygon_coords, year)
+        
+        # Monthly GHI as one typed array; months without data come back as 0 GHI,
+        # so missing and zero values become NaN and are left out of the average
+        ghi = np.fromiter(
+            (data.get('ghi_kwh_per_m2_day') or np.nan for data in monthly_data.values()),
+            dtype=np.float64, count=len(monthly_data)
+        )
         
         return {
             'year': year,
             'monthly_data': monthly_data,
-            'annual_average_ghi': np.mean([
-                data['ghi_kwh_per_m2_day'] for data in monthly_data.values()
-                if data.get('ghi_kwh_per_m2_day')
-            ]) if monthly_data else 0
+            'annual_average_ghi': float(np.nanmean(ghi)) if np.isfinite(ghi).any() else 0
         }
     
+    def _fetch_monthly_records(self, polygon_coords: List[Tuple[float, float]],
+                               year: int, months: List[int]) -> Dict[int, Dict]:
+        """Reduced solar band dictionaries for the given months, in one request"""
+        geometry = self.create_polygon_geometry(polygon_coords)
+        solar_bands = self.era5_daily.filterBounds(geometry)
+            
+        def month_stats(month):
+            """Server-side mean radiation over the polygon for one month"""
+            start = ee.Date.fromYMD(year, month, 1)
+            month_mean = self._temporal_mean(solar_bands.filterDate(start, start.advance(1, 'month')),
+                                             self.SOLAR_BANDS)
+            stats = month_mean.reduceRegion(
+                reducer=ee.Reducer.mean(),
+                geometry=geometry,
+                scale=11132,  # ~10km resolution
+                maxPixels=1e9
+            )
+            return ee.Feature(None, stats).set('month', month)
+        
+        # All the reductions run in one deferred graph and come back in one request
+        result = ee.FeatureCollection(ee.List(months).map(month_stats)).getInfo()
+        
+        records = {}
+        for feature in result.get('features', []):
+            properties = dict(feature.get('properties', {}))
+            records[int(properties.pop('month'))] = properties
+        return records
+    
+    @staticmethod
+    def _month_range(year: int, month: int) -> Tuple[str, str]:
+        """'YYYY-MM-DD' start (inclusive) and end (exclusive) dates of a month"""
+        start_date = f"{year}-{month:02d}-01"
+        if month == 12:
+            end_date = f"{year + 1}-01-01"
+        else:
+            end_date = f"{year}-{month + 1:02d}-01"
+        return start_date, end_date
+    
+    def _get_monthly_solar_data_concurrent(self, polygon_coords: List[Tuple[float, float]],
+                                           year: int) -> Dict:
+        """Monthly records via one get_solar_irradiance_data request per month, issued concurrently"""
+        results = {}
+        with ThreadPoolExecutor(max_workers=12) as executor:
+            futures = {
+                executor.submit(self.get_solar_irradiance_data, polygon_coords,
+                                *self._month_range(year, month)): month
+                for month in range(1, 13)
+            }
+            for future in as_completed(futures):
+                month_data = future.result()
+                if month_data:
+                    results[futures[future]] = month_data
+        
+        return {f"month_{month:02d}": results[month] for month in sorted(results)}
+    
     def compare_with_mock_data(self, polygon_coords: List[Tuple[float, float]], 
-                              mock_ghi: float) -> Dict:
+                              mock_ghi: float, gee_data: Optional[Dict] = None) -> Dict:
         """
         Compare GEE data with mock/calculated data
+        
+        gee_data: result of get_solar_irradiance_data for this polygon, if the
+            caller already has it (otherwise it is fetched here)
         """
-        gee_data = self.get_solar_irradiance_data(polygon_coords)
+        if gee_data is None:
+            gee_data = self.get_solar_irradiance_data(polygon_coords)
         
         if not gee_data:
             return None
@@ -302,7 +740,7 @@ class GEESolarDataRetriever:
 #         }
         
 #     except Exception as e:
-#         print(f"❌ Test failed: {str(e)}")
+#         logger.error("❌ Test failed: %s", e)
 #         return {'status': 'failed', 'error': str(e)}
 
 # if __name__ == '__main__':
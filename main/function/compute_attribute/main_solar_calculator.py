@@ -128,7 +128,8 @@ class EnhancedSolarSystem:
                                 polygon_coords: List[Tuple[float, float]],
                                 monthly_consumption_kwh: float = 600,
                                 panel_efficiency: float = 0.17,
-                                system_losses: float = 0.15) -> Dict[str, Any]:
+                                system_losses: float = 0.15,
+                                satellite_data: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
         Comprehensive rooftop solar potential analysis.
         
@@ -137,6 +138,7 @@ class EnhancedSolarSystem:
             monthly_consumption_kwh: Monthly electricity consumption in kWh
             panel_efficiency: Solar panel efficiency (default 17%)
             system_losses: System losses factor (default 15%)
+            satellite_data: Satellite record already fetched in bulk (skips the per-polygon query)
             
         Returns:
             Dictionary containing comprehensive analysis results
@@ -152,7 +154,7 @@ class EnhancedSolarSystem:
             
             # Enhanced irradiance calculation with adaptive buffering
             irradiance_result = self._get_enhanced_irradiance(
-                centroid_lat, centroid_lon, polygon_coords
+                centroid_lat, centroid_lon, polygon_coords, satellite_data
             )
             
             # Rooftop-specific calculations
@@ -212,14 +214,35 @@ class EnhancedSolarSystem:
                 ]
             }
     
+    def compute_irradiance_only(self,
+                                polygon_coords: List[Tuple[float, float]],
+                                satellite_data: Optional[Dict[str, Any]] = None,
+                                centroid: Optional[Tuple[float, float]] = None) -> Dict[str, Any]:
+        """
+        Irradiance part of analyze_rooftop_potential only.
+        
+        Skips the area, rooftop, energy and economic stages for callers that
+        size the system themselves and only need 'irradiance_analysis'.
+        
+        Args:
+            polygon_coords: List of (longitude, latitude) coordinates
+            satellite_data: Satellite record already fetched in bulk (skips the per-polygon query)
+            centroid: (longitude, latitude) centroid if already known
+        """
+        if centroid is None:
+            centroid = self._calculate_centroid(polygon_coords)
+        centroid_lon, centroid_lat = centroid
+        return self._get_enhanced_irradiance(centroid_lat, centroid_lon, polygon_coords, satellite_data)
+    
     def _get_enhanced_irradiance(self, lat: float, lon: float, 
-                               polygon_coords: List[Tuple[float, float]]) -> Dict[str, Any]:
+                               polygon_coords: List[Tuple[float, float]],
+                               satellite_data: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Get enhanced irradiance data using adaptive buffering if needed."""
         try:
             # First try enhanced rooftop calculator
             if hasattr(self, 'rooftop_calculator'):
                 result = self.rooftop_calculator.calculate_enhanced_irradiance(
-                    lat=lat, lon=lon, polygon_coords=polygon_coords
+                    lat=lat, lon=lon, polygon_coords=polygon_coords, satellite_data=satellite_data
                 )
                 if result.get('success', True):
                     return result
@@ -6,9 +6,102 @@ from shapely.geometry import Polygon, Point
 import folium
 from folium.plugins import Draw, Fullscreen
 from function.solar_prediction_engine import SolarPredictionEngine
-from typing import List, Tuple, Dict
+from typing import Dict, Iterable, List, Tuple
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
 import json
+import os
+import threading
 
+try:
+    from rasterio.features import rasterize
+    from rasterio.transform import from_bounds
+    RASTERIO_AVAILABLE = True
+except ImportError:
+    RASTERIO_AVAILABLE = False
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+if NUMBA_AVAILABLE:
+    _NUMBA_LAUNCH_LOCK = threading.Lock()
+
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _fill_overlay(minx, maxx, miny, maxy, edges, ramp, out):
+        """
+        Fused mask + gradient kernel writing a map-oriented RGBA overlay in one pass.
+
+        edges is an (E, 4) array of polygon ring segments (x0, y0, x1, y1); a pixel is
+        inside when a ray cast from it crosses an odd number of edges, so holes work too.
+        ramp holds one uint8 RGB color per grid row, south to north.
+        Row 0 of out is the northern edge, matching the flipped NumPy path.
+        """
+        height, width = out.shape[0], out.shape[1]
+        dx = (maxx - minx) / (width - 1) if width > 1 else 0.0
+        dy = (maxy - miny) / (height - 1) if height > 1 else 0.0
+        for row in prange(height):
+            i = height - 1 - row
+            y = miny + i * dy
+            r, g, b = ramp[i, 0], ramp[i, 1], ramp[i, 2]
+            for j in range(width):
+                x = minx + j * dx
+                inside = False
+                for e in range(edges.shape[0]):
+                    x0, y0, x1, y1 = edges[e, 0], edges[e, 1], edges[e, 2], edges[e, 3]
+                    if (y0 > y) != (y1 > y):
+                        if x < x0 + (y - y0) * (x1 - x0) / (y1 - y0):
+                            inside = not inside
+                out[row, j, 0] = r
+                out[row, j, 1] = g
+                out[row, j, 2] = b
+                out[row, j, 3] = 255 if inside else 0
+
+
+def _polygon_edges(polygon) -> np.ndarray:
+    """Return every ring segment of a polygon (holes included) as an (E, 4) array of x0, y0, x1, y1"""
+    rings = [polygon.exterior] + list(polygon.interiors)
+    return np.vstack([np.hstack((np.asarray(ring.coords)[:-1], np.asarray(ring.coords)[1:]))
+                      for ring in rings])
+
+def _scanline_mask(polygon, xs: np.ndarray, ys: np.ndarray) -> np.ndarray:
+    """
+    Pure NumPy scanline fill of a polygon on the grid xs × ys (rows follow ys).
+
+    For every scanline only the edges whose y-slab contains it are active; a pixel is
+    inside when an odd number of active edge crossings lie to its right.
+    """
+    x0, y0, x1, y1 = _polygon_edges(polygon).T
+    edge_ymin = np.minimum(y0, y1)
+    edge_ymax = np.maximum(y0, y1)
+    active = (ys[:, None] >= edge_ymin) & (ys[:, None] < edge_ymax)          # (H, E)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        x_cross = x0 + (ys[:, None] - y0) * (x1 - x0) / (y1 - y0)            # (H, E)
+    x_cross = np.where(active, x_cross, -np.inf)
+    crossings = (xs[None, :, None] < x_cross[:, None, :]).sum(axis=2)       # (H, W)
+    return crossings % 2 == 1
+
+
+def _np_default(o):
+    """json.dump fallback converting numpy scalars and arrays to native Python types"""
+    if isinstance(o, np.integer):
+        return int(o)
+    if isinstance(o, np.floating):
+        return float(o)
+    if isinstance(o, np.bool_):
+        return bool(o)
+    if isinstance(o, np.ndarray):
+        return o.tolist()
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+# Cosmetic intensity jitter for enhanced overlays, built once and tiled across each grid
+NOISE_TILE = np.clip(np.random.default_rng(0).normal(0, 0.1, (16, 16)), -0.3, 0.3).astype(np.float32)
+
+# Overlays are written once and read back once by folium, so favour encode speed over size
+PNG_SAVE_OPTIONS = {'format': 'PNG', 'compress_level': 1, 'optimize': False}
 
 list_palettes = [
         ((255, 165, 0), (255, 255, 255)),        # Orange to white
@@ -23,20 +116,32 @@ class EnhancedSolarRooftopSystem:
     def __init__(self):
         self.prediction_engine = SolarPredictionEngine()
         self.analysis_results = {}
+        # 256-entry uint8 gradient lookup tables, one per palette
+        self._palette_luts = {palette: self._build_lut(palette) for palette in list_palettes}
+        # Consumption-independent analyses keyed by polygon coordinates
+        self._geom_cache: Dict[Tuple, Dict] = {}
+        # Summary totals over the latest analyze_all_rooftops batch
+        self._totals: Dict[str, float] = {}
+        # Coordinates hash of the geometry file written by this instance
+        self._saved_geom_hash = None
         
-    def hex_to_rgb(self, hex_color):
+    @staticmethod
+    @lru_cache(maxsize=64)
+    def hex_to_rgb(hex_color: str) -> tuple:
         hex_color = hex_color.lstrip('#')
         return tuple(int(hex_color[i:i+2], 16) for i in (0, 2, 4))
 
-    def interpolate_colors(self, start_color, end_color, n):
+    @staticmethod
+    def interpolate_colors(start_color, end_color, n):
         # Accept hex or RGB tuple
         if isinstance(start_color, str): 
-            start_color = self.hex_to_rgb(start_color)
+            start_color = EnhancedSolarRooftopSystem.hex_to_rgb(start_color)
         if isinstance(end_color, str): 
-            end_color = self.hex_to_rgb(end_color)
-        start = np.array(start_color)
-        end = np.array(end_color)
-        ratios = np.linspace(0, 1, n)[:, None]
+            end_color = EnhancedSolarRooftopSystem.hex_to_rgb(end_color)
+        # float32 is plenty for values that end up as uint8
+        start = np.asarray(start_color, dtype=np.float32)
+        end = np.asarray(end_color, dtype=np.float32)
+        ratios = np.linspace(0, 1, n, dtype=np.float32)[:, None]
         return (start * (1 - ratios) + end * ratios).astype(np.uint8)
 
     def analyze_all_rooftops(self, polygon_coords_list: List[List[Tuple[float, float]]], 
@@ -46,12 +151,43 @@ class EnhancedSolarRooftopSystem:
         """
         results = []
         for i, coords in enumerate(polygon_coords_list):
-            analysis = self.prediction_engine.analyze_rooftop(coords, monthly_consumption_kwh)
-            analysis['polygon_id'] = i
+            key = tuple(tuple(coord) for coord in coords)
+            cached = self._geom_cache.get(key)
+            if cached is None:
+                analysis = self.prediction_engine.analyze_rooftop(coords, monthly_consumption_kwh)
+                self._geom_cache[key] = analysis
+            else:
+                # Only the economics depend on consumption
+                analysis = self.prediction_engine.recompute_economics(cached, monthly_consumption_kwh)
+            analysis = dict(analysis, polygon_id=i)
             results.append(analysis)
             self.analysis_results[i] = analysis
+        self._totals = self._aggregate_totals(results)
         return results
 
+    @staticmethod
+    def _aggregate_totals(analyses: Iterable[Dict]) -> Dict[str, float]:
+        """Aggregate analyses in a single pass for the map summary and the report"""
+        totals = {
+            'roof_area_m2': 0.0,
+            'panel_count': 0,
+            'yearly_energy_kwh': 0.0,
+            'system_cost': 0.0,
+            'monthly_savings': 0.0,
+            'solar_score_sum': 0.0
+        }
+        count = 0
+        for r in analyses:
+            count += 1
+            totals['roof_area_m2'] += r['roof_analysis']['area_m2']
+            totals['panel_count'] += r['panel_optimization']['panel_count']
+            totals['yearly_energy_kwh'] += r['energy_production']['yearly_energy_kwh']
+            totals['system_cost'] += r['economic_analysis']['total_system_cost']
+            totals['monthly_savings'] += r['economic_analysis']['monthly_bill_reduction']
+            totals['solar_score_sum'] += r['solar_potential_score']
+        totals['average_solar_score'] = totals['solar_score_sum'] / max(count, 1)
+        return totals
+
     def get_optimized_palettes(self, analysis_results: List[Dict]) -> List[Tuple[str, str]]:
         """
         Generate optimized color palettes based on solar potential scores
@@ -78,24 +214,25 @@ class EnhancedSolarRooftopSystem:
         color_palette = analysis_data['recommended_color_palette']
         
         # Create gradient from orange to white across the entire area
-        n_pix = grid_shape[0] * grid_shape[1]
-        rgb_colors = self.interpolate_colors(color_palette[0], color_palette[1], n_pix).reshape(grid_shape[0], grid_shape[1], 3)
+        # (one color per row, broadcast along each row; rows run north to south)
+        ramp = self._palette_ramp(color_palette, grid_shape[0])[::-1]
+        rgb_colors = np.broadcast_to(ramp[:, None, :], (grid_shape[0], grid_shape[1], 3))
         
-        # Apply solar potential intensity variation
+        # Apply solar potential intensity variation (fixed noise tile repeated over the grid)
         potential_score = analysis_data['solar_potential_score'] / 100
-        intensity_map = np.random.normal(potential_score, 0.1, grid_shape)
-        intensity_map = np.clip(intensity_map, 0, 1)
+        reps = (-(-grid_shape[0] // NOISE_TILE.shape[0]), -(-grid_shape[1] // NOISE_TILE.shape[1]))
+        noise = np.tile(NOISE_TILE, reps)[:grid_shape[0], :grid_shape[1]]
+        intensity_map = np.clip(np.float32(potential_score) + noise, 0, 1)
         
-        # Modulate colors based on intensity
-        for i in range(3):  # RGB channels
-            rgb_colors[:, :, i] = rgb_colors[:, :, i] * intensity_map
+        # Modulate all RGB channels in a single broadcast multiply
+        rgb_colors = np.clip(rgb_colors * intensity_map[:, :, None], 0, 255).astype(np.uint8)
         
         # No masking - show full gradient with semi-transparent alpha
-        alpha = np.full(grid_shape, 180, dtype=np.uint8)  # Semi-transparent overlay
-        rgba = np.dstack([rgb_colors.astype(np.uint8), alpha])
-        rgba = np.flipud(rgba)  # Correct orientation for mapping
+        rgba = np.empty((grid_shape[0], grid_shape[1], 4), dtype=np.uint8)
+        rgba[:, :, :3] = rgb_colors
+        rgba[:, :, 3] = 180  # Semi-transparent overlay
         img = Image.fromarray(rgba, mode='RGBA')
-        img.save(fname)
+        img.save(fname, **PNG_SAVE_OPTIONS)
         return (miny, minx), (maxy, maxx), fname
 
     def create_info_popup(self, analysis_data: Dict) -> str:
@@ -151,45 +288,171 @@ class EnhancedSolarRooftopSystem:
         """
         return popup_html
 
-    def hex_to_rgb(self, hex_color):
-        hex_color = hex_color.lstrip('#')
-        return tuple(int(hex_color[i:i+2], 16) for i in (0, 2, 4))
+    def _build_lut(self, palette):
+        return self.interpolate_colors(palette[0], palette[1], 256)
 
-    def interpolate_colors(self, start_color, end_color, n):
-        # Accept hex or RGB tuple
-        if isinstance(start_color, str): 
-            start_color = self.hex_to_rgb(start_color)
-        if isinstance(end_color, str): 
-            end_color = self.hex_to_rgb(end_color)
-        start = np.array(start_color)
-        end = np.array(end_color)
-        ratios = np.linspace(0, 1, n)[:, None]
-        return (start * (1 - ratios) + end * ratios).astype(np.uint8)
+    def _palette_ramp(self, palette, n):
+        # Gather an n-color gradient from the palette's cached LUT instead of re-interpolating
+        key = tuple(palette)
+        lut = self._palette_luts.get(key)
+        if lut is None:
+            lut = self._palette_luts[key] = self._build_lut(key)
+        return lut[np.rint(np.linspace(0, 255, n)).astype(np.uint8)]
+
+    @staticmethod
+    @lru_cache(maxsize=8)
+    def _unit_axes(grid_shape: tuple) -> tuple:
+        # Normalized (u, v) pixel axes in [0, 1], shared by every rooftop with this grid_shape
+        u = np.linspace(0, 1, grid_shape[1])
+        v = np.linspace(0, 1, grid_shape[0])
+        u.flags.writeable = False
+        v.flags.writeable = False
+        return u, v
 
     def create_masked_overlay_image(self, polygon, grid_shape, palette, fname='masked_overlay.png'):
         minx, miny, maxx, maxy = polygon.bounds
-        xs = np.linspace(minx, maxx, grid_shape[1])
-        ys = np.linspace(miny, maxy, grid_shape[0])
-        xx, yy = np.meshgrid(xs, ys)
-        lonlats = np.column_stack((xx.ravel(), yy.ravel()))
-        mask = np.array([polygon.contains(Point(lon, lat)) for lon, lat in lonlats]).reshape(grid_shape)
-
-        # Palette is (start, end), can be hex or RGB
-        n_pix = grid_shape[0] * grid_shape[1]
-        rgb_colors = self.interpolate_colors(palette[0], palette[1], n_pix).reshape(grid_shape[0], grid_shape[1], 3)
-        alpha = (mask * 255).astype(np.uint8)
-        rgba = np.dstack([rgb_colors, alpha])
-        rgba = np.flipud(rgba)  # Correct orientation for mapping
+        if NUMBA_AVAILABLE:
+            # Single fused pass: point-in-polygon, gradient and alpha, already north-up
+            edges = _polygon_edges(polygon)
+            ramp = self._palette_ramp(palette, grid_shape[0])
+            rgba = np.empty((grid_shape[0], grid_shape[1], 4), dtype=np.uint8)
+            # The kernel already spreads rows over all cores; serialize launches from
+            # overlay worker threads (numba's default workqueue layer is not thread-safe)
+            with _NUMBA_LAUNCH_LOCK:
+                _fill_overlay(minx, maxx, miny, maxy, edges, ramp, rgba)
+            img = Image.fromarray(rgba, mode='RGBA')
+            img.save(fname, **PNG_SAVE_OPTIONS)
+            return (miny, minx), (maxy, maxx), fname
+
+        # Rows run north to south so the buffer is already in map orientation
+        if RASTERIO_AVAILABLE:
+            # Scanline fill straight into the alpha channel
+            transform = from_bounds(minx, miny, maxx, maxy, grid_shape[1], grid_shape[0])
+            alpha = rasterize([(polygon, 255)], out_shape=grid_shape, transform=transform,
+                              fill=0, dtype=np.uint8, all_touched=False)
+        else:
+            # Affine-map the shared unit axes onto this rooftop's bounds (north to south)
+            u, v = self._unit_axes(tuple(grid_shape))
+            xs = minx + (maxx - minx) * u
+            ys = maxy + (miny - maxy) * v
+            mask = _scanline_mask(polygon, xs, ys)
+            alpha = (mask * 255).astype(np.uint8)
+
+        # Palette is (start, end), can be hex or RGB; the gradient starts at the southern edge
+        ramp = self._palette_ramp(palette, grid_shape[0])[::-1]
+        rgba = np.empty((grid_shape[0], grid_shape[1], 4), dtype=np.uint8)
+        rgba[:, :, :3] = ramp[:, None, :]
+        rgba[:, :, 3] = alpha
         img = Image.fromarray(rgba, mode='RGBA')
-        img.save(fname)
+        img.save(fname, **PNG_SAVE_OPTIONS)
         return (miny, minx), (maxy, maxx), fname
 
 
+    def _build_overlay(self, job):
+        """Create the overlay image for one rooftop; returns (sw, ne, fname)"""
+        idx, polygon, analysis, fname, grid_shape, rgb = job
+        if rgb:
+            palette = list_palettes[idx % len(list_palettes)]
+            return self.create_masked_overlay_image(polygon, grid_shape, palette, fname)
+        return self.create_enhanced_overlay_image(polygon, analysis, grid_shape, fname)
+
+    def save_analysis_results(self, polygon_coords_list, analysis_results, file_suffix: str = ''):
+        """
+        Save analysis results as a geometry-invariant file plus a small per-run economics file
+
+        Only the economics depend on consumption, so within one run the geometry file is
+        written once per set of polygons (tracked by a hash of their coordinates). It is
+        always rewritten by a new run, since irradiance depends on the analysis date.
+        """
+        polygons_hash = hashlib.sha1(repr([tuple(map(tuple, coords)) for coords in polygon_coords_list])
+                                     .encode()).hexdigest()
+        geom_file = Path('files') / 'solar_analysis_geom.json'
+
+        if self._saved_geom_hash != polygons_hash:
+            geom_block = {
+                'polygons_hash': polygons_hash,
+                'results': [{k: v for k, v in r.items() if k != 'economic_analysis'}
+                            for r in analysis_results],
+            }
+            with open(geom_file, 'w') as f:
+                # numpy types are converted by the encoder as it walks the results
+                json.dump(geom_block, f, indent=2, default=_np_default)
+            self._saved_geom_hash = polygons_hash
+            print(f"Geometry analysis saved as {geom_file}")
+
+        econ_block = {
+            'polygons_hash': polygons_hash,
+            'results': [{'polygon_id': r['polygon_id'], 'economic_analysis': r['economic_analysis']}
+                        for r in analysis_results],
+        }
+        econ_file = Path('files') / f'solar_analysis_econ{file_suffix}.json'
+        with open(econ_file, 'w') as f:
+            json.dump(econ_block, f, indent=2, default=_np_default)
+        print(f"Economic analysis saved as {econ_file}")
+
+    def create_base_map(self, polygons,
+                        tile_layer='https://mt1.google.com/vt/lyrs=s&x={x}&y={y}&z={z}') -> folium.Map:
+        """
+        Create the satellite base map centred on the first polygon
+        """
+        centroid = polygons[0].centroid
+        m = folium.Map(location=[centroid.y, centroid.x], zoom_start=18)
+
+        folium.TileLayer(
+            tiles=tile_layer,
+            attr='Google',
+            name='Google Satellite',
+            overlay=True,
+            control=True
+        ).add_to(m)
+        return m
+
+    def add_map_controls(self, m: folium.Map) -> folium.Map:
+        """
+        Add layer control, fullscreen, drawing tools and coordinate capture to a finished map
+        """
+        folium.LayerControl().add_to(m)
+        Fullscreen(position='topright').add_to(m)
+        Draw().add_to(m)
+
+        # Enhanced JavaScript for coordinate capture
+        custom_js = """
+        <script>
+        map.on('draw:created', function (e) {
+            var type = e.layerType,
+                layer = e.layer;
+            if (type === 'polygon') {
+                var coords = layer.getLatLngs()[0]
+                    .map(function(latlng) {
+                        return '(' + latlng.lng.toFixed(6) + ',' + latlng.lat.toFixed(6) + ')';
+                    })
+                    .join(',');
+                var popup_content = 'New Polygon Coordinates:<br>' + coords + 
+                                  '<br><br>Copy this format for analysis:<br>[' + coords + ']';
+                layer.bindPopup(popup_content).openPopup();
+                console.log('New polygon coordinates:', coords);
+            }
+            drawnItems.addLayer(layer);
+        });
+        </script>
+        """
+        m.get_root().html.add_child(folium.Element(custom_js))
+        return m
+
     def render_enhanced_map(self, polygons, polygon_coords_list, monthly_consumption_kwh=500, 
                           grid_shape=(100, 100), show_map=True,rgb=True,
-                          tile_layer='https://mt1.google.com/vt/lyrs=s&x={x}&y={y}&z={z}') -> folium.Map:
+                          tile_layer='https://mt1.google.com/vt/lyrs=s&x={x}&y={y}&z={z}',
+                          file_suffix: str = '', existing_map: folium.Map = None,
+                          layer_group_name: str = None) -> folium.Map:
         """
         Render enhanced map with solar analysis
+
+        file_suffix is appended to every generated file name so that several
+        renders (e.g. one per scenario) do not overwrite each other.
+
+        When existing_map is given the overlays are added to it (inside a toggleable
+        FeatureGroup when layer_group_name is set) and the caller is responsible for
+        add_map_controls and saving; only the analysis JSON is written here.
         """
         if not polygons:
             print("No polygons to display.")
@@ -199,11 +462,11 @@ class EnhancedSolarRooftopSystem:
         print("Analyzing rooftops for solar potential...")
         analysis_results = self.analyze_all_rooftops(polygon_coords_list, monthly_consumption_kwh)
         
-        # Create summary statistics
-        total_panels = sum(r['panel_optimization']['panel_count'] for r in analysis_results)
-        total_yearly_energy = sum(r['energy_production']['yearly_energy_kwh'] for r in analysis_results)
-        total_monthly_savings = sum(r['economic_analysis']['monthly_bill_reduction'] for r in analysis_results)
-        avg_solar_score = np.mean([r['solar_potential_score'] for r in analysis_results])
+        # Summary statistics (aggregated once by analyze_all_rooftops)
+        total_panels = self._totals['panel_count']
+        total_yearly_energy = self._totals['yearly_energy_kwh']
+        total_monthly_savings = self._totals['monthly_savings']
+        avg_solar_score = self._totals['average_solar_score']
         
         print(f"\n=== COMPREHENSIVE SOLAR ANALYSIS SUMMARY ===")
         print(f"Total Rooftops Analyzed: {len(analysis_results)}")
@@ -213,29 +476,23 @@ class EnhancedSolarRooftopSystem:
         print(f"Average Solar Potential Score: {avg_solar_score:.1f}/100")
 
         centroid = polygons[0].centroid
-        m = folium.Map(location=[centroid.y, centroid.x], zoom_start=18)
-
-        folium.TileLayer(
-            tiles=tile_layer,
-            attr='Google',
-            name='Google Satellite',
-            overlay=True,
-            control=True
-        ).add_to(m)
+        m = existing_map if existing_map is not None else self.create_base_map(polygons, tile_layer)
+        layer = folium.FeatureGroup(name=layer_group_name).add_to(m) if layer_group_name else m
 
         # Create files directory
         Path('files').mkdir(exist_ok=True)
         overlay_files = []
 
+        # Build overlay images concurrently (NumPy/PIL release the GIL), then add
+        # them to the map in rooftop order from this thread
+        jobs = [(idx, polygon, analysis, str(Path('files') / f'solar_overlay_{idx}{file_suffix}.png'),
+                 grid_shape, rgb)
+                for idx, (polygon, analysis) in enumerate(zip(polygons, analysis_results))]
+        with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+            overlays = list(executor.map(self._build_overlay, jobs))
+
         # Add enhanced overlays for each polygon
-        for idx, (polygon, analysis) in enumerate(zip(polygons, analysis_results)):
-            fname = str(Path('files') / f'solar_overlay_{idx}.png')
-            
-            if rgb:
-                palette = list_palettes[idx % len(list_palettes)]
-                sw, ne, fname = self.create_masked_overlay_image(polygon, grid_shape, palette, fname)
-            else:
-                sw, ne, fname = self.create_enhanced_overlay_image(polygon, analysis, grid_shape, fname)
+        for (idx, polygon, analysis, _, _, _), (sw, ne, fname) in zip(jobs, overlays):
             overlay_files.append(fname)
             
             # Add overlay
@@ -244,7 +501,7 @@ class EnhancedSolarRooftopSystem:
                 image=fname,
                 bounds=[sw, ne],
                 opacity=0.8
-            ).add_to(m)
+            ).add_to(layer)
             
             # # Add detailed popup
             # folium_coords = [(lat, lon) for lon, lat in polygon.exterior.coords]
@@ -274,56 +531,18 @@ class EnhancedSolarRooftopSystem:
             location=[centroid.y, centroid.x],
             popup=folium.Popup(summary_html, max_width=300),
             icon=folium.Icon(color='blue', icon='info-sign')
-        ).add_to(m)
-
-        folium.LayerControl().add_to(m)
-        Fullscreen(position='topright').add_to(m)
-        Draw().add_to(m)
+        ).add_to(layer)
 
-        # Enhanced JavaScript for coordinate capture
-        custom_js = """
-        <script>
-        map.on('draw:created', function (e) {
-            var type = e.layerType,
-                layer = e.layer;
-            if (type === 'polygon') {
-                var coords = layer.getLatLngs()[0]
-                    .map(function(latlng) {
-                        return '(' + latlng.lng.toFixed(6) + ',' + latlng.lat.toFixed(6) + ')';
-                    })
-                    .join(',');
-                var popup_content = 'New Polygon Coordinates:<br>' + coords + 
-                                  '<br><br>Copy this format for analysis:<br>[' + coords + ']';
-                layer.bindPopup(popup_content).openPopup();
-                console.log('New polygon coordinates:', coords);
-            }
-            drawnItems.addLayer(layer);
-        });
-        </script>
-        """
-        m.get_root().html.add_child(folium.Element(custom_js))
+        if existing_map is None:
+            self.add_map_controls(m)
 
         if show_map:
-            map_file = str(Path('files') / 'enhanced_solar_map.html')
-            m.save(map_file)
-            print(f"\nEnhanced solar map saved as {map_file}")
+            if existing_map is None:
+                map_file = str(Path('files') / f'enhanced_solar_map{file_suffix}.html')
+                m.save(map_file)
+                print(f"\nEnhanced solar map saved as {map_file}")
             
-            # Save analysis results to JSON
-            results_file = str(Path('files') / 'solar_analysis_results.json')
-            with open(results_file, 'w') as f:
-                # Convert numpy types to native Python types for JSON serialization
-                json_results = []
-                for result in analysis_results:
-                    json_result = {}
-                    for key, value in result.items():
-                        if isinstance(value, dict):
-                            json_result[key] = {k: float(v) if isinstance(v, (np.integer, np.floating)) else v 
-                                              for k, v in value.items()}
-                        else:
-                            json_result[key] = float(value) if isinstance(value, (np.integer, np.floating)) else value
-                    json_results.append(json_result)
-                json.dump(json_results, f, indent=2)
-            print(f"Analysis results saved as {results_file}")
+            self.save_analysis_results(polygon_coords_list, analysis_results, file_suffix)
             
             return m
         else:
@@ -341,12 +560,6 @@ class EnhancedSolarRooftopSystem:
         report += "COMPREHENSIVE SOLAR ROOFTOP ANALYSIS REPORT\n"
         report += "=" * 60 + "\n\n"
         
-        total_area = 0
-        total_panels = 0
-        total_yearly_energy = 0
-        total_cost = 0
-        total_savings = 0
-        
         for i, analysis in self.analysis_results.items():
             roof = analysis['roof_analysis']
             panels = analysis['panel_optimization']
@@ -364,18 +577,16 @@ class EnhancedSolarRooftopSystem:
             report += f"Monthly Savings: ${economics['monthly_bill_reduction']:.0f}\n"
             report += f"Payback Period: {economics['payback_years']:.1f} years\n"
             report += f"ROI: {economics['roi_percentage']:.1f}%\n\n"
-            
-            total_area += roof['area_m2']
-            total_panels += panels['panel_count']
-            total_yearly_energy += energy['yearly_energy_kwh']
-            total_cost += economics['total_system_cost']
-            total_savings += economics['monthly_bill_reduction']
+        
+        totals = self._aggregate_totals(self.analysis_results.values())
+        total_cost = totals['system_cost']
+        total_savings = totals['monthly_savings']
         
         report += "SUMMARY TOTALS\n"
         report += "=" * 20 + "\n"
-        report += f"Total Roof Area: {total_area:.1f} m²\n"
-        report += f"Total Panels: {total_panels}\n"
-        report += f"Total Yearly Energy: {total_yearly_energy:.0f} kWh\n"
+        report += f"Total Roof Area: {totals['roof_area_m2']:.1f} m²\n"
+        report += f"Total Panels: {totals['panel_count']}\n"
+        report += f"Total Yearly Energy: {totals['yearly_energy_kwh']:.0f} kWh\n"
         report += f"Total System Cost: ${total_cost:,.0f}\n"
         report += f"Total Monthly Savings: ${total_savings:.0f}\n"
         report += f"Total Annual Savings: ${total_savings * 12:.0f}\n"
@@ -416,5 +627,5 @@ if __name__ == '__main__':
     print("\n" + report)
     print("\nFiles generated:")
     print("- enhanced_solar_map.html (Interactive map)")
-    print("- solar_analysis_results.json (Raw data)")
+    print("- solar_analysis_geom.json / solar_analysis_econ.json (Raw data)")
     print("- solar_analysis_report.txt (Summary report)")
@@ -4,6 +4,7 @@ import numpy as np
 from PIL import Image
 import matplotlib.pyplot as plt
 from shapely.geometry import Polygon, Point
+import shapely
 
 import folium
 from folium.plugins import Draw, Fullscreen
@@ -98,8 +99,7 @@ def create_masked_overlay_image(polygon, grid_shape, color_palette, fname='maske
     xs = np.linspace(minx, maxx, grid_shape[1])
     ys = np.linspace(miny, maxy, grid_shape[0])
     xx, yy = np.meshgrid(xs, ys)
-    lonlats = np.column_stack((xx.ravel(), yy.ravel()))
-    mask = np.array([polygon.contains(Point(lon, lat)) for lon, lat in lonlats]).reshape(grid_shape)
+    mask = shapely.contains_xy(polygon, xx, yy)
 
     # Palette is (start, end), can be hex or RGB
     n_pix = grid_shape[0] * grid_shape[1]
@@ -243,6 +243,18 @@ class SolarPredictionEngine:
             )
         }
 
+    def recompute_economics(self, analysis: Dict, monthly_consumption_kwh: float = 500) -> Dict:
+        """
+        Re-run only the economic analysis of an existing rooftop analysis for a new consumption level
+        """
+        # Geometry, irradiance, panels and energy do not depend on consumption
+        economic_data = self.calculate_economic_analysis(
+            analysis['energy_production']['yearly_energy_kwh'],
+            analysis['panel_optimization']['panel_count'],
+            monthly_consumption_kwh
+        )
+        return {**analysis, 'economic_analysis': economic_data}
+
 # Example usage and testing
 if __name__ == '__main__':
     engine = SolarPredictionEngine()
@@ -7,6 +7,7 @@ This script demonstrates the complete solar analysis workflow
 from function.compute_color.enhanced_solsat_system import EnhancedSolarRooftopSystem
 from function.compute_color.solar_prediction_engine import SolarPredictionEngine
 from shapely.geometry import Polygon
+from pathlib import Path
 import json
 
 def main():
@@ -40,50 +41,64 @@ def main():
         {"name": "Small Business", "consumption": 1200}
     ]
     
+    # All scenarios share one map, each as a toggleable layer group
+    map_obj = system.create_base_map(polygons)
+    
     for scenario in scenarios:
         print(f"\n📊 SCENARIO: {scenario['name']} ({scenario['consumption']} kWh/month)")
         print("-" * 60)
         
-        # Create enhanced map with solar analysis
-        map_obj = system.render_enhanced_map(
+        # Add this scenario's overlays to the shared map
+        system.render_enhanced_map(
             polygons=polygons,
             polygon_coords_list=rooftop_coordinates,
             monthly_consumption_kwh=scenario['consumption'],
             grid_shape=(100, 100),
             show_map=True,
-            rgb=True
+            rgb=True,
+            file_suffix=f"_{_scenario_file_name(scenario)}",
+            existing_map=map_obj,
+            layer_group_name=scenario['name']
         )
         
         # Generate detailed report
         report = system.generate_report()
         
         # Save scenario-specific files
-        scenario_name = scenario['name'].lower().replace(' ', '_')
-        with open(f'files/report_{scenario_name}.txt', 'w') as f:
-            f.write(f"SCENARIO: {scenario['name']}\n")
-            f.write(f"Monthly Consumption: {scenario['consumption']} kWh\n\n")
-            f.write(report)
+        scenario_name = _scenario_file_name(scenario)
+        Path(f'files/report_{scenario_name}.txt').write_text(
+            f"SCENARIO: {scenario['name']}\n"
+            f"Monthly Consumption: {scenario['consumption']} kWh\n\n"
+            f"{report}"
+        )
         
         print(f"✅ Analysis complete for {scenario['name']}")
         print(f"📄 Report saved as: report_{scenario_name}.txt")
     
+    # Save the combined map once
+    system.add_map_controls(map_obj)
+    map_obj.save('files/enhanced_solar_map.html')
+    print("\n🗺️ Combined scenario map saved as: files/enhanced_solar_map.html")
+    
     # Create a summary comparison
     print("\n🔍 GENERATING COMPARISON SUMMARY...")
-    create_scenario_comparison(rooftop_coordinates)
+    create_scenario_comparison(system, rooftop_coordinates)
     
     print("\n🎉 DEMO COMPLETE!")
     print("\nGenerated Files:")
-    print("📁 files/enhanced_solar_map.html - Interactive map")
-    print("📁 files/solar_analysis_results.json - Raw analysis data")
+    print("📁 files/enhanced_solar_map.html - Interactive map (one layer per scenario)")
+    print("📁 files/solar_analysis_geom.json - Geometry, irradiance and energy data (shared)")
+    print("📁 files/solar_analysis_econ_*.json - Economic analysis per scenario")
     print("📁 files/solar_analysis_report.txt - Detailed report")
     print("📁 files/scenario_comparison.json - Scenario comparison")
     print("📁 files/report_*.txt - Individual scenario reports")
 
-def create_scenario_comparison(rooftop_coordinates):
-    """Create a comparison of different consumption scenarios"""
-    system = EnhancedSolarRooftopSystem()
-    polygons = [Polygon(coords) for coords in rooftop_coordinates]
-    
+def _scenario_file_name(scenario):
+    """File-name slug for a scenario, e.g. 'Small Business' -> 'small_business'"""
+    return scenario['name'].lower().replace(' ', '_')
+
+def create_scenario_comparison(system, rooftop_coordinates):
+    """Create a comparison of different consumption scenarios using the caller's system"""
     scenarios = [300, 500, 800, 1200]  # kWh/month
     comparison_data = {}
     
@@ -109,8 +124,7 @@ def create_scenario_comparison(rooftop_coordinates):
         }
     
     # Save comparison
-    with open('files/scenario_comparison.json', 'w') as f:
-        json.dump(comparison_data, f, indent=2)
+    Path('files/scenario_comparison.json').write_text(json.dumps(comparison_data, indent=2))
     
     # Print summary
     print("\n📈 SCENARIO COMPARISON SUMMARY:")
@@ -33,6 +33,12 @@ setup(
     python_requires=">=3.9",
     install_requires=requirements,
     extras_require={
+        "fast": [
+            "numba>=0.57",
+            "rasterio>=1.3",
+            "orjson>=3.9",
+            "diskcache>=5.6",
+        ],
         "dev": [
             "pytest>=7.0",
             "pytest-cov>=4.0",